@@ -0,0 +1,159 @@
+"""
+Time alignment of series recorded on different clocks.
+
+Variants don't share a time base: udp_prague starts at Time=1, cubic at 0,
+and baseline_propagation_delay_df is sampled every 30 s while baseline_thrpt
+is per second. align() resamples any set of series onto one grid so they
+can be combined element-wise:
+
+    linear   np.interp between neighbouring samples
+    step     last sample at or before each grid point (searchsorted), for
+             piecewise-constant series such as the 30 s baseline
+
+Grid points outside a series' own time range are NaN. Results are kept in
+a FigureCache LRU keyed by the frames' content hashes, so repeated requests
+for the same alignment are free and a data reload invalidates them.
+
+queueing_delay() and utilization() are built on top of it.
+"""
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from figure_cache import FigureCache, dataset_version
+
+LINEAR = "linear"
+STEP = "step"
+ALIGN_CACHE_SIZE = int(os.environ.get("DASH_ALIGN_CACHE_SIZE", 32))
+
+alignment_cache = FigureCache(ALIGN_CACHE_SIZE)
+
+
+# ---- Resampling ----
+def _clean(x, y):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    if len(x) > 1 and np.any(np.diff(x) < 0):
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+    return x, y
+
+
+def resample(x, y, grid, mode=LINEAR):
+    """Values of the series (x, y) at every point of `grid`."""
+    x, y = _clean(x, y)
+    grid = np.asarray(grid, dtype=np.float64)
+    if not len(x):
+        return np.full(len(grid), np.nan)
+    if mode == LINEAR:
+        return np.interp(grid, x, y, left=np.nan, right=np.nan)
+    if mode == STEP:
+        idx = np.searchsorted(x, grid, side="right") - 1
+        valid = (idx >= 0) & (grid <= x[-1])
+        out = np.full(len(grid), np.nan)
+        out[valid] = y[idx[valid]]
+        return out
+    raise ValueError(f"Unknown resampling mode {mode!r}; use {LINEAR!r} or {STEP!r}")
+
+
+def common_grid(xs, step=None, span="intersection"):
+    """
+    Evenly spaced grid covering several time arrays.
+
+    `span` is "intersection" (where every series has data) or "union";
+    `step` defaults to the finest median sampling interval among them.
+    """
+    xs = [np.asarray(x, dtype=np.float64) for x in xs if len(x)]
+    if not xs:
+        return np.zeros(0)
+    starts = [np.nanmin(x) for x in xs]
+    stops = [np.nanmax(x) for x in xs]
+    if span == "intersection":
+        start, stop = max(starts), min(stops)
+    elif span == "union":
+        start, stop = min(starts), max(stops)
+    else:
+        raise ValueError(f"Unknown span {span!r}; use 'intersection' or 'union'")
+    if step is None:
+        steps = [np.median(np.diff(np.sort(x))) for x in xs if len(x) > 1]
+        step = min((s for s in steps if s > 0), default=1.0)
+    if stop < start:
+        return np.zeros(0)
+    n = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return start + np.arange(n) * step
+
+
+# ---- Alignment ----
+def _modes(mode, legends):
+    if isinstance(mode, str):
+        return {legend: mode for legend in legends}
+    return {legend: mode.get(legend, LINEAR) for legend in legends}
+
+
+def align(frames, y_label, step=None, span="intersection", mode=LINEAR,
+          x_label="Time", grid=None, cache=None):
+    """
+    {legend: DataFrame} -> one DataFrame with x_label and a column per legend,
+    every series resampled onto the same grid.
+
+    `mode` is LINEAR, STEP or {legend: mode}; `grid` overrides step/span.
+    The result is cached and shared between callers: don't modify it.
+    """
+    store = cache if cache is not None else alignment_cache
+    legends = list(frames)
+    modes = _modes(mode, legends)
+    grid_key = None
+    if grid is not None:
+        grid_key = hashlib.sha1(np.asarray(grid, dtype=np.float64).tobytes()).hexdigest()
+    name = "\0".join(["align", y_label, x_label] + legends)
+    version = dataset_version(frames)
+    store.set_version(name, version)
+    key = (name, version, tuple(legends), tuple(modes.values()), step, span, grid_key)
+
+    aligned = store.get(key)
+    if aligned is None:
+        if grid is None:
+            grid = common_grid([frames[legend][x_label].to_numpy() for legend in legends], step, span)
+        columns = {x_label: np.asarray(grid, dtype=np.float64)}
+        for legend in legends:
+            df = frames[legend]
+            columns[legend] = resample(
+                df[x_label].to_numpy(), df[y_label].to_numpy(), grid, modes[legend]
+            )
+        aligned = pd.DataFrame(columns, columns=[x_label] + legends, copy=False)
+        store.put(key, aligned)
+    return aligned
+
+
+def _versus(frames, y_label, baseline, op, out_label, step, mode, x_label):
+    legends = [legend for legend in frames if legend != baseline]
+    aligned = align(frames, y_label, step=step, mode=mode, x_label=x_label)
+    base = aligned[baseline].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            legend: pd.DataFrame({x_label: aligned[x_label].to_numpy(),
+                                  out_label: op(aligned[legend].to_numpy(), base)})
+            for legend in legends
+        }
+
+
+def queueing_delay(frames, baseline="Propagation Delay", y_label="SmoothedRTT",
+                   step=None, mode=None, x_label="Time"):
+    """
+    {legend: DataFrame(Time, QueueingDelay)}: each variant's RTT minus the
+    baseline propagation delay, in the RTT's units. The baseline is held
+    (STEP) between its samples unless `mode` says otherwise.
+    """
+    mode = mode if mode is not None else {baseline: STEP}
+    return _versus(frames, y_label, baseline, np.subtract, "QueueingDelay", step, mode, x_label)
+
+
+def utilization(frames, baseline="Bandwidth Capacity", y_label="Throughput (Mbit/s)",
+                step=None, mode=None, x_label="Time"):
+    """{legend: DataFrame(Time, Utilization)}: throughput as % of the capacity series."""
+    mode = mode if mode is not None else {baseline: STEP}
+    return _versus(frames, y_label, baseline,
+                   lambda y, base: y / base * 100, "Utilization", step, mode, x_label)
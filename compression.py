@@ -0,0 +1,75 @@
+"""
+Response compression for the Dash JSON endpoints.
+
+Layout, dependency and callback responses are gzip- or brotli-compressed
+(brotli when the optional `brotli` package is installed and the client
+accepts it). Small bodies and responses that are already encoded are left
+alone.
+"""
+import gzip
+
+import flask
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+DASH_ENDPOINTS = ("_dash-layout", "_dash-dependencies", "_dash-update-component")
+
+
+def choose_encoding(accept_encoding):
+    """Best encoding we can produce for an Accept-Encoding header, or None."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        key, _, q = params.strip().partition("=")
+        try:
+            if key.strip() == "q" and float(q) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def install_compression(app, endpoints=DASH_ENDPOINTS):
+    """Compress responses from the given Dash endpoints of `app`."""
+    prefix = app.config.routes_pathname_prefix
+    targets = {prefix + e for e in endpoints}
+
+    @app.server.after_request
+    def _compress_response(response):
+        if flask.request.path not in targets:
+            return response
+        response.vary.add("Accept-Encoding")
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        encoding = choose_encoding(flask.request.headers.get("Accept-Encoding"))
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < MIN_SIZE:
+            return response
+        response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    return _compress_response
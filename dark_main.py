@@ -2,15 +2,17 @@ import dash
 from dash import dcc, html, Input, Output
 import plotly.express as px
 import pandas as pd
+from data_cache import load_csv
+from figure_cache import memoize_figure
 
 # ---- Step 1: Load DataFrames ----
-utf_rtt = pd.read_csv('./graph_data/udp_prague_rtt.csv')
-tfcubic_rtt = pd.read_csv('./graph_data/cubic_rtt.csv')
-baseline_propagation_delay_df = pd.read_csv('./graph_data/baseline_propagation_delay_df.csv')
+utf_rtt = load_csv('./graph_data/udp_prague_rtt.csv')
+tfcubic_rtt = load_csv('./graph_data/cubic_rtt.csv')
+baseline_propagation_delay_df = load_csv('./graph_data/baseline_propagation_delay_df.csv')
 
-baseline_throuhgput_df = pd.read_csv('./graph_data/baseline_throughput.csv')
-tfcubic_thrpt = pd.read_csv('./graph_data/cubic_thrpt.csv')
-utf_thrpt = pd.read_csv('./graph_data/udp_prague_thrpt.csv')
+baseline_throuhgput_df = load_csv('./graph_data/baseline_throughput.csv')
+tfcubic_thrpt = load_csv('./graph_data/cubic_thrpt.csv')
+utf_thrpt = load_csv('./graph_data/udp_prague_thrpt.csv')
 
 # ---- Step 2: Bundle data ----
 rtt_paths = {
@@ -27,6 +29,7 @@ thrpt_paths = {
 
 # ---- Step 3: Dash App ----
 app = dash.Dash(__name__)
+server = app.server  # WSGI entry point, see serve.py
 app.title = "RTT and Throughput Comparison"
 
 dark_background = "#1e1e1e"
@@ -84,6 +87,7 @@ app.layout = html.Div(
     Output("comparison-graph", "figure"),
     Input("metric-type", "value")
 )
+@memoize_figure(lambda: [rtt_paths, thrpt_paths])
 def update_comparison_graph(metric_type):
     if metric_type == "RTT":
         data_dict = rtt_paths
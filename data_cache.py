@@ -0,0 +1,178 @@
+"""
+Columnar on-disk cache for the dashboard CSVs.
+
+Each CSV is parsed once and stored as one typed .npy file per column plus a
+small meta.json that records the source path, size and mtime. Later loads read
+the .npy files straight back and only re-parse the CSV when the source file
+has changed.
+
+Text columns are stored as their UTF-8 bytes, the offsets between values and
+a mask of missing cells, and come back as object arrays with NaN where the
+CSV was empty, as pd.read_csv gives them.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = os.environ.get("GRAPH_CACHE_DIR", "./.graph_cache")
+MMAP_MODE = None if os.environ.get("GRAPH_CACHE_MMAP") == "0" else "r"
+META_FILE = "meta.json"
+FORMAT = 2  # bump when the entry layout changes; older entries are rebuilt
+
+
+# ---- Cache Layout ----
+def cache_path_for(path, cache_dir=None):
+    """Return the cache entry directory used for the CSV at `path`."""
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir or CACHE_DIR, f"{name}-{key}")
+
+
+def file_stamp(path):
+    """Size and mtime of `path`; anything derived from it is stale once they change."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _source_stamp(path):
+    return {"source": os.path.abspath(path), **file_stamp(path)}
+
+
+def staging_dir(target):
+    """Empty scratch directory next to `target`, private to this process."""
+    tmp = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    return tmp
+
+
+def swap_dir(tmp, target):
+    """
+    Replace directory `target` with the finished `tmp`, so other workers never
+    see a half-written one. Processes still mapping the old files keep valid
+    views until they reload; rewriting those files in place would crash them.
+    """
+    shutil.rmtree(target, ignore_errors=True)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # Another worker won the race; its copy is just as good as ours.
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read_meta(entry):
+    try:
+        with open(os.path.join(entry, META_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(meta, stamp):
+    if meta is None or "content_hash" not in meta or meta.get("format") != FORMAT:
+        return False
+    return all(meta.get(k) == v for k, v in stamp.items())
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---- Text Columns ----
+def _save_text(directory, i, values):
+    null = pd.isna(values)
+    encoded = [b"" if missing else str(v).encode("utf-8") for v, missing in zip(values, null)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    files = {"file": f"{i}.npy", "offsets": f"{i}-offsets.npy", "null": f"{i}-null.npy"}
+    np.save(os.path.join(directory, files["file"]), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(os.path.join(directory, files["offsets"]), offsets)
+    np.save(os.path.join(directory, files["null"]), null)
+    return {**files, "dtype": "|O"}
+
+
+def _load_text(entry, column):
+    blob = np.load(os.path.join(entry, column["file"])).tobytes()
+    offsets = np.load(os.path.join(entry, column["offsets"]))
+    null = np.load(os.path.join(entry, column["null"]))
+    values = np.empty(len(null), dtype=object)
+    values[:] = [blob[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+    values[null] = np.nan
+    return values
+
+
+# ---- Build / Read ----
+def _write_entry(path, entry, stamp):
+    df = pd.read_csv(path)
+    content_hash = file_hash(path)
+
+    tmp = staging_dir(entry)
+    columns = []
+    for i, name in enumerate(df.columns):
+        values = df[name].to_numpy()
+        if values.dtype == object:
+            columns.append({"name": name, **_save_text(tmp, i, values)})
+            continue
+        file_name = f"{i}.npy"
+        np.save(os.path.join(tmp, file_name), values, allow_pickle=False)
+        columns.append({"name": name, "file": file_name, "dtype": values.dtype.str})
+
+    meta = {**stamp, "format": FORMAT, "content_hash": content_hash, "rows": len(df), "columns": columns}
+    with open(os.path.join(tmp, META_FILE), "w") as f:
+        json.dump(meta, f)
+    swap_dir(tmp, entry)
+    return meta
+
+
+def _read_entry(entry, meta, columns=None):
+    wanted = meta["columns"]
+    if columns is not None:
+        by_name = {c["name"]: c for c in wanted}
+        missing = [c for c in columns if c not in by_name]
+        if missing:
+            raise KeyError(f"{missing} not in {meta['source']}")
+        wanted = [by_name[c] for c in columns]
+
+    data = {
+        c["name"]: _load_text(entry, c) if "offsets" in c else
+        np.load(os.path.join(entry, c["file"]), mmap_mode=MMAP_MODE, allow_pickle=False)
+        for c in wanted
+    }
+    df = pd.DataFrame(data, columns=[c["name"] for c in wanted], copy=False)
+    df.attrs["content_hash"] = meta["content_hash"]
+    return df
+
+
+def load_csv(path, columns=None, cache_dir=None):
+    """
+    Drop-in replacement for pd.read_csv(path) backed by the columnar cache.
+
+    `columns` restricts the result to the named columns; on a warm cache only
+    those columns are read from disk.
+    """
+    entry = cache_path_for(path, cache_dir)
+    stamp = _source_stamp(path)
+    meta = _read_meta(entry)
+
+    if _is_fresh(meta, stamp):
+        try:
+            return _read_entry(entry, meta, columns)
+        except (OSError, ValueError):
+            pass  # Damaged entry: rebuild it below.
+
+    try:
+        meta = _write_entry(path, entry, stamp)
+        return _read_entry(entry, meta, columns)
+    except OSError:
+        # Read-only checkout or full disk: serve straight from the CSV.
+        df = pd.read_csv(path)
+        df.attrs["content_hash"] = file_hash(path)
+        return df[list(columns)] if columns is not None else df
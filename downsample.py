@@ -0,0 +1,58 @@
+"""
+Server-side downsampling of telemetry series to the visible x-range.
+
+relayout_x_range() reads the zoomed x-range out of a graph's relayoutData;
+pyramid answers it with about two points per horizontal pixel (MAX_POINTS).
+minmax() bucketing keeps every spike, e.g. RTT excursions; series that are
+already small enough come back at full resolution.
+"""
+import os
+
+import numpy as np
+
+PIXEL_WIDTH = int(os.environ.get("DASH_GRAPH_PIXEL_WIDTH", 1000))
+MAX_POINTS = 2 * PIXEL_WIDTH
+
+
+# ---- Range Handling ----
+def relayout_x_range(relayout_data, axis="xaxis"):
+    """
+    Read the x-range out of a dcc.Graph relayoutData event.
+
+    Returns (changed, x_range): x_range is (x0, x1), or None when the axis
+    was reset to autorange. `changed` is False for events that leave the
+    x-axis alone (initial autosize, drag mode, y-only zoom).
+    """
+    if not relayout_data:
+        return False, None
+    if relayout_data.get(f"{axis}.autorange"):
+        return True, None
+    if f"{axis}.range[0]" in relayout_data and f"{axis}.range[1]" in relayout_data:
+        return True, (relayout_data[f"{axis}.range[0]"], relayout_data[f"{axis}.range[1]"])
+    if f"{axis}.range" in relayout_data:
+        x0, x1 = relayout_data[f"{axis}.range"]
+        return True, (x0, x1)
+    return False, None
+
+
+# ---- Reducers ----
+def minmax(x, y, n_out):
+    """Keep the first/last point and the min and max of each bucket, in x order."""
+    n = len(x)
+    if n <= n_out or n_out < 4:
+        return x, y
+
+    n_buckets = (n_out - 2) // 2
+    size = -(-(n - 2) // n_buckets)
+    body = np.asarray(y[1:-1], dtype=float)
+    pad = n_buckets * size - len(body)
+
+    lo = np.concatenate([np.where(np.isnan(body), np.inf, body), np.full(pad, np.inf)])
+    hi = np.concatenate([np.where(np.isnan(body), -np.inf, body), np.full(pad, -np.inf)])
+    offsets = np.arange(n_buckets) * size + 1
+    idx_min = lo.reshape(n_buckets, size).argmin(axis=1) + offsets
+    idx_max = hi.reshape(n_buckets, size).argmax(axis=1) + offsets
+
+    idx = np.unique(np.concatenate([[0, n - 1], idx_min, idx_max]))
+    idx = idx[idx < n]
+    return x[idx], y[idx]
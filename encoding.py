@@ -0,0 +1,104 @@
+"""
+Compact binary encoding of trace arrays in figure payloads.
+
+Numeric x/y arrays are sent as plotly.js typed-array specs,
+{"dtype": "f4", "bdata": "<base64>"}, instead of JSON number lists. Floats
+are downcast to float32 only when the rounding error stays below both
+FLOAT32_RTOL of the array's range and half the smallest gap between its
+distinct values, so no two points merge or swap (e.g. epoch-second x values
+stay float64). Integers go to the narrowest type plotly.js supports. Arrays
+that cannot be encoded (strings, datetimes, integers outside the 32-bit
+range, which plotly.js has no typed array for) and empty arrays are left as
+they are.
+"""
+import base64
+
+import numpy as np
+
+FLOAT32_RTOL = 1e-6  # max float32 rounding error, as a fraction of the range
+ENCODED_ATTRS = ("x", "y")
+
+_INT_TYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32]
+_SHORT_TYPES = {
+    "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+    "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8",
+}
+
+
+def _float32_ok(values, narrow):
+    """True when float32 keeps `values` accurate and their points distinct."""
+    finite = np.isfinite(values)
+    if not np.array_equal(finite, np.isfinite(narrow)):
+        return False  # out of float32 range
+    values = values[finite]
+    if values.size == 0:
+        return True
+    error = np.abs(narrow[finite].astype(np.float64) - values).max()
+    if error == 0:
+        return True
+    distinct = np.unique(values)
+    if distinct.size < 2:
+        return error <= FLOAT32_RTOL * abs(distinct[0])
+    limit = min(np.diff(distinct).min() / 2, FLOAT32_RTOL * (distinct[-1] - distinct[0]))
+    return error < limit
+
+
+def _narrow(values, float32=True):
+    if values.dtype.kind in "iu":
+        if values.size == 0:
+            return values.astype(np.int32)
+        lo, hi = values.min(), values.max()
+        for t in _INT_TYPES:
+            info = np.iinfo(t)
+            if info.min <= lo and hi <= info.max:
+                return values.astype(t)
+        return None  # float64 would round values above 2**53
+
+    if values.dtype.kind == "f":
+        values = values.astype(np.float64, copy=False)
+        if float32:
+            narrow = values.astype(np.float32)
+            if _float32_ok(values, narrow):
+                return narrow
+        return values
+
+    if values.dtype.kind == "b":
+        return values.astype(np.uint8)
+    return None
+
+
+def encode_array(values, float32=True):
+    """Typed-array spec for `values`, or `values` unchanged if it can't be encoded."""
+    arr = np.asarray(values)
+    if arr.ndim != 1 or arr.size == 0:
+        return values
+    narrow = _narrow(arr, float32)
+    if narrow is None:
+        return values
+    narrow = np.ascontiguousarray(narrow, dtype=narrow.dtype.newbyteorder("<"))
+    return {
+        "dtype": _SHORT_TYPES[narrow.dtype.name],
+        "bdata": base64.b64encode(narrow.tobytes()).decode("ascii"),
+    }
+
+
+def decode_array(spec):
+    """Inverse of encode_array; handy when inspecting payloads."""
+    dtype = np.dtype(spec["dtype"]).newbyteorder("<")
+    return np.frombuffer(base64.b64decode(spec["bdata"]), dtype=dtype)
+
+
+def encode_figure(fig, float32=True, attrs=ENCODED_ATTRS):
+    """
+    Plain-dict version of `fig` with its trace arrays binary encoded.
+
+    The result can go anywhere Dash accepts a figure (dcc.Graph(figure=...),
+    callback outputs, dcc.Store data).
+    """
+    out = fig.to_plotly_json()
+    for trace, trace_json in zip(fig.data, out["data"]):
+        for attr in attrs:
+            values = trace[attr]
+            if values is not None and not isinstance(values, (str, dict)):
+                trace_json[attr] = encode_array(values, float32)
+    return out
@@ -0,0 +1,116 @@
+"""
+Bounded LRU memoization for figure builders.
+
+A figure builder such as update_comparison_graph is a pure function of its
+arguments (metric, render options) and of the loaded data. Cache keys combine
+the builder name, its arguments and a dataset version derived from the
+content hashes of the frames it plots, so each (metric, dataset) pair is
+built once rather than once per user per click. When the data reloads with
+different content the version changes and the builder's older entries are
+dropped.
+"""
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+FIGURE_CACHE_SIZE = int(os.environ.get("DASH_FIGURE_CACHE_SIZE", 64))
+
+
+# ---- Dataset Versions ----
+def frame_version(df):
+    """Content hash of one DataFrame; free for frames loaded through data_cache."""
+    version = df.attrs.get("content_hash")
+    if version is None:
+        hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        version = hashlib.sha1(hashed.tobytes()).hexdigest()
+        df.attrs["content_hash"] = version
+    return version
+
+
+def dataset_version(*data_dicts):
+    """Version of a set of {legend: DataFrame} dicts."""
+    h = hashlib.sha1()
+    for data_dict in data_dicts:
+        for name, df in data_dict.items():
+            h.update(f"{name}\0{frame_version(df)}\0".encode("utf-8"))
+    return h.hexdigest()
+
+
+# ---- LRU Cache ----
+class FigureCache:
+    def __init__(self, maxsize=FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def set_version(self, name, version):
+        """Record the dataset version for `name`, dropping its entries if it changed."""
+        with self._lock:
+            if self._versions.get(name, version) != version:
+                for key in [k for k in self._entries if k[0] == name]:
+                    del self._entries[key]
+            self._versions[name] = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+figure_cache = FigureCache()
+
+
+def memoize_figure(datasets, cache=None):
+    """
+    Decorator for figure builders.
+
+    `datasets` is a zero-argument callable returning the {legend: DataFrame}
+    dicts the builder reads, e.g. lambda: [rtt_paths, thrpt_paths]; it is
+    called on every invocation so reloaded globals are picked up.
+    """
+    def decorator(build):
+        name = f"{build.__module__}.{build.__qualname__}"
+
+        @functools.wraps(build)
+        def wrapper(*args, **kwargs):
+            store = cache if cache is not None else figure_cache
+            version = dataset_version(*datasets())
+            store.set_version(name, version)
+            key = (name, version, args, tuple(sorted(kwargs.items())))
+            fig = store.get(key)
+            if fig is None:
+                fig = build(*args, **kwargs)
+                store.put(key, fig)
+            return fig
+
+        return wrapper
+
+    return decorator
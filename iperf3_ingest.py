@@ -0,0 +1,407 @@
+"""
+Streaming ingestion of iperf3 --json output.
+
+The document is scanned incrementally: "start" and "end" (small) are decoded
+whole, while the "intervals" array is decoded one interval at a time, so
+memory use does not grow with the run length. Per-stream fields go straight
+into typed column buffers and come out as 2-D (interval x stream) arrays:
+
+    start, end, seconds, bytes, bits_per_second, retransmits,
+    snd_cwnd, rtt, rttvar
+
+plus per-interval columns in the dashboard's schema (Time, Throughput
+(Mbit/s), SmoothedRTT, Retransmits, snd_cwnd_kb, ...) aggregated across
+streams with vectorized reductions, including Jain's fairness index, and a
+"<column> per flow" 2-D column for each of them. Fields a given iperf3 side
+does not report (e.g. rtt on the receiver) are NaN.
+
+A campaign directory is imported in parallel with import_directory(): files
+are converted on a process pool and each run's metadata (congestion control,
+duration, timestamp, host, kernel, ...) is recorded in one catalog.json in
+the output directory. Files whose size and mtime match the catalog are
+skipped, so re-running an import only converts new or changed files.
+
+A test still running with `iperf3 --json-stream` (one {"event", "data"}
+object per line) can be followed with Iperf3TailReader, whose read() returns
+the new intervals in the same dashboard columns.
+
+    python iperf3_ingest.py iperf3_client_cubic_iperf3_d120.json [out.series]
+    python iperf3_ingest.py campaign/ [out_dir] [--workers N]
+"""
+import argparse
+import glob
+import json
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from data_cache import file_stamp
+from series_store import SUFFIX, is_run, per_flow, write_run
+from tail_reader import TailReader
+
+READ_CHUNK = 1 << 20
+CATALOG_FILE = "catalog.json"
+DEFAULT_PATTERN = "iperf3_*.json"
+STREAM_FIELDS = (
+    "start", "end", "seconds", "bytes", "bits_per_second",
+    "retransmits", "snd_cwnd", "rtt", "rttvar",
+)
+SUM_FIELDS = ("start", "end", "bytes", "bits_per_second", "retransmits")
+
+
+# ---- Incremental JSON Scanner ----
+class _Scanner:
+    """Just enough of a pull parser to walk one top-level object lazily."""
+
+    def __init__(self, fp, chunk_size=READ_CHUNK):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer holds one value at most.
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character (without consuming it), or "" at EOF."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, got {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number or literal ending exactly at the buffer edge may be cut short.
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_document(fp):
+    """
+    Yield ("start", dict), ("interval", dict) per interval, ("end", dict)
+    and any other top-level (key, value) pairs, in file order.
+    """
+    scan = _Scanner(fp)
+    scan.expect("{")
+    if scan.peek() == "}":
+        return
+    while True:
+        key = scan.value()
+        scan.expect(":")
+        if key == "intervals":
+            scan.expect("[")
+            if scan.peek() != "]":
+                while True:
+                    yield "interval", scan.value()
+                    if scan.peek() == ",":
+                        scan.pos += 1
+                        continue
+                    break
+            scan.expect("]")
+        else:
+            yield key, scan.value()
+        if scan.peek() == ",":
+            scan.pos += 1
+            continue
+        scan.expect("}")
+        return
+
+
+# ---- Column Extraction ----
+def _num(value):
+    return float("nan") if value is None else float(value)
+
+
+class _IntervalColumns:
+    def __init__(self, n_streams):
+        self.n_streams = n_streams
+        self.sockets = None
+        self.stream = {f: array("d") for f in STREAM_FIELDS}
+        self.sum = {f: array("d") for f in SUM_FIELDS}
+        self.omitted = array("b")
+        self.n_intervals = 0
+
+    def add(self, interval):
+        streams = interval.get("streams", [])
+        if self.sockets is None:
+            self.sockets = [s.get("socket") for s in streams][:self.n_streams] or [None]
+            self.n_streams = len(self.sockets)
+        by_socket = {s.get("socket"): s for s in streams}
+        for socket in self.sockets:
+            s = by_socket.get(socket, {})
+            for f in STREAM_FIELDS:
+                self.stream[f].append(_num(s.get(f)))
+        total = interval.get("sum", {})
+        for f in SUM_FIELDS:
+            self.sum[f].append(_num(total.get(f)))
+        self.omitted.append(bool(total.get("omitted", False)))
+        self.n_intervals += 1
+
+    def arrays(self):
+        shape = (self.n_intervals, self.n_streams)
+        streams = {
+            f: np.frombuffer(self.stream[f], dtype=np.float64).reshape(shape)
+            for f in STREAM_FIELDS
+        }
+        sums = {f: np.frombuffer(self.sum[f], dtype=np.float64) for f in SUM_FIELDS}
+        return streams, sums, np.frombuffer(self.omitted, dtype=np.int8).astype(bool)
+
+
+def read_iperf3(path):
+    """
+    Stream an iperf3 JSON file into arrays.
+
+    Returns {"start": dict, "end": dict, "error": str|None, "sockets": list,
+    "streams": {field: 2-D array}, "sum": {field: 1-D array}, "omitted": bool array}.
+    """
+    meta = {"start": {}, "end": {}, "error": None}
+    columns = None
+    with open(path, "r") as fp:
+        for key, value in iter_document(fp):
+            if key == "interval":
+                if columns is None:
+                    n = meta["start"].get("test_start", {}).get("num_streams") or len(value.get("streams", []))
+                    columns = _IntervalColumns(max(int(n), 1))
+                columns.add(value)
+            else:
+                meta[key] = value
+    if columns is None:
+        columns = _IntervalColumns(1)
+    streams, sums, omitted = columns.arrays()
+    return {**meta, "sockets": columns.sockets or [], "streams": streams, "sum": sums, "omitted": omitted}
+
+
+def _nan_stats(values):
+    """Per-row (count, sum, sum of squares) over the stream axis, ignoring NaN."""
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    return valid.sum(axis=1), filled.sum(axis=1), np.square(filled).sum(axis=1)
+
+
+def aggregate_streams(values):
+    """
+    Vectorized per-interval aggregates of an (interval x stream) array:
+    {"sum", "mean", "fairness"}; fairness is Jain's index
+    (sum x)^2 / (n * sum x^2), 1.0 when all streams are equal.
+    """
+    count, total, squares = _nan_stats(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        fairness = np.square(total) / (count * squares)
+    total = np.where(count > 0, total, np.nan)
+    return {"sum": total, "mean": mean, "fairness": fairness}
+
+
+def dashboard_columns(data):
+    """
+    Per-interval columns in the schema the dashboards plot, plus per_flow()
+    2-D versions of them for the per-flow views.
+    """
+    streams, sums = data["streams"], data["sum"]
+    flows = {
+        "Throughput (Mbit/s)": streams["bits_per_second"] / 1e6,
+        "SmoothedRTT": streams["rtt"] / 1000.0,  # iperf3 reports usec
+        "RTTVar": streams["rttvar"] / 1000.0,
+        "Retransmits": streams["retransmits"],
+        "snd_cwnd_kb": streams["snd_cwnd"] / 1024.0,
+    }
+    throughput = aggregate_streams(flows["Throughput (Mbit/s)"])
+    columns = {
+        "Time": sums["start"],
+        "Throughput (Mbit/s)": sums["bits_per_second"] / 1e6,
+        "Throughput_mean": throughput["mean"],
+        "Fairness": throughput["fairness"],
+        "SmoothedRTT": aggregate_streams(flows["SmoothedRTT"])["mean"],
+        "RTTVar": aggregate_streams(flows["RTTVar"])["mean"],
+        "Retransmits": sums["retransmits"],
+        "snd_cwnd_kb": aggregate_streams(flows["snd_cwnd_kb"])["sum"],
+    }
+    columns.update({per_flow(name): values for name, values in flows.items()})
+    return columns
+
+
+def parse_system_info(system_info):
+    """Host and kernel from iperf3's `uname -a` style system_info string."""
+    parts = (system_info or "").split()
+    return {
+        "host": parts[1] if len(parts) > 1 else None,
+        "kernel": parts[2] if len(parts) > 2 else None,
+    }
+
+
+def run_attrs(data, path=None):
+    """Small JSON-able summary of the test for the run header."""
+    start, end = data["start"], data["end"]
+    test = start.get("test_start", {})
+    return {
+        **parse_system_info(start.get("system_info")),
+        "source": os.path.abspath(path) if path else None,
+        "tool": start.get("version"),
+        "protocol": test.get("protocol"),
+        "num_streams": test.get("num_streams"),
+        "duration": test.get("duration"),
+        "timestamp": start.get("timestamp", {}).get("timesecs"),
+        "system_info": start.get("system_info"),
+        "congestion": end.get("sender_tcp_congestion"),
+        "sockets": data["sockets"],
+        "error": data.get("error"),
+    }
+
+
+def ingest_iperf3(path, out_path=None):
+    """Convert one iperf3 JSON file to a series run; returns the run header."""
+    data = read_iperf3(path)
+    out_path = out_path or os.path.splitext(path)[0] + SUFFIX
+    columns = dashboard_columns(data)
+    columns.update({f"stream_{f}": v for f, v in data["streams"].items()})
+    columns["omitted"] = data["omitted"]
+    return write_run(out_path, columns, index="Time", attrs=run_attrs(data, path))
+
+
+class Iperf3TailReader(TailReader):
+    """
+    Tails the output of `iperf3 --json-stream`; read() returns the intervals
+    completed since the last read as dashboard_columns().
+    """
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.start = {}
+        self.sockets = None
+
+    def _reset(self):
+        super()._reset()
+        self.start = {}
+        self.sockets = None
+
+    def read(self, max_bytes=READ_CHUNK):
+        columns = None
+        for line in self.read_lines(max_bytes).splitlines():
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # Blank or non-JSON line (e.g. a warning on stdout).
+            if event.get("event") == "start":
+                self.start = event.get("data", {})
+            elif event.get("event") == "interval":
+                interval = event.get("data", {})
+                if columns is None:
+                    n = (len(self.sockets) if self.sockets else
+                         self.start.get("test_start", {}).get("num_streams")
+                         or len(interval.get("streams", [])))
+                    columns = _IntervalColumns(max(int(n), 1))
+                    columns.sockets = self.sockets
+                columns.add(interval)
+        if columns is None:
+            columns = _IntervalColumns(len(self.sockets) if self.sockets else 1)
+        self.sockets = columns.sockets or self.sockets
+        streams, sums, _ = columns.arrays()
+        return dashboard_columns({"streams": streams, "sum": sums})
+
+
+# ---- Batch Import ----
+def read_catalog(out_dir):
+    """{source file name: entry} of a previous import ({} if none)."""
+    try:
+        with open(os.path.join(out_dir, CATALOG_FILE), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_catalog(out_dir, catalog):
+    path = os.path.join(out_dir, CATALOG_FILE)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(catalog, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _import_one(src, dst):
+    # Runs in a worker process; returns only the small catalog entry.
+    stamp = file_stamp(src)
+    header = ingest_iperf3(src, dst)
+    attrs = {k: v for k, v in header["attrs"].items() if k != "sockets"}
+    return {**stamp, **attrs, "run": os.path.basename(dst), "intervals": header["length"]}
+
+
+def import_directory(src_dir, out_dir=None, pattern=DEFAULT_PATTERN, workers=None, force=False):
+    """
+    Convert every iperf3 JSON in `src_dir` matching `pattern` to a run in
+    `out_dir` (default: `src_dir`) and update its catalog.
+
+    Returns (catalog, {file name: error message} for files that failed).
+    """
+    out_dir = out_dir or src_dir
+    os.makedirs(out_dir, exist_ok=True)
+    catalog = read_catalog(out_dir)
+
+    pending = {}
+    for src in sorted(glob.glob(os.path.join(src_dir, pattern))):
+        name = os.path.basename(src)
+        dst = os.path.join(out_dir, os.path.splitext(name)[0] + SUFFIX)
+        entry = catalog.get(name)
+        if not force and entry and is_run(dst) and all(entry.get(k) == v for k, v in file_stamp(src).items()):
+            continue
+        pending[name] = (src, dst)
+
+    errors = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_import_one, src, dst): name for name, (src, dst) in pending.items()}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    catalog[name] = future.result()
+                except Exception as exc:
+                    errors[name] = f"{type(exc).__name__}: {exc}"
+                    catalog.pop(name, None)
+        _write_catalog(out_dir, catalog)
+    return catalog, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="iperf3 JSON file or directory of them")
+    parser.add_argument("out", nargs="?", help="output .series path (file) or directory")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="re-import unchanged files")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source):
+        catalog, errors = import_directory(args.source, args.out, args.pattern, args.workers, args.force)
+        print(f"{args.source}: {len(catalog)} runs in catalog, {len(errors)} failed")
+        for name, message in sorted(errors.items()):
+            print(f"  {name}: {message}")
+    else:
+        header = ingest_iperf3(args.source, args.out)
+        print(f"{args.source}: {header['length']} intervals, {header['attrs']['num_streams']} stream(s)")
@@ -0,0 +1,116 @@
+"""
+Live telemetry for the dashboards.
+
+Producers append (time, value) points per (variant, metric) to a server-side
+LiveStore, backed by preallocated ring buffers (see ringbuffer). The
+dashboard polls it with a dcc.Interval and pushes only the points added
+since its last poll to the graphs' extendData, trimmed to LIVE_MAX_POINTS
+per trace, so the full figure is never re-sent.
+
+Growing CSVs can be followed with LiveStore.follow_csv(), other logs with
+follow() and their tail reader (e.g. ss_ingest.SsTailReader or
+iperf3_ingest.Iperf3TailReader). They are polled from the request thread
+(poll()), not from background threads, so following survives serve.py's
+pre-fork. Each worker process has its own store; with several workers, every
+worker tails the same files. The client's cursors are
+therefore the last Time sent per trace, not row counts, so whichever worker
+answers a poll sends only points the browser doesn't have yet.
+"""
+import os
+import threading
+import time
+
+import pandas as pd
+from ringbuffer import TelemetryStore
+from tail_reader import CsvTailReader
+
+LIVE_MAX_POINTS = int(os.environ.get("DASH_LIVE_MAX_POINTS", 3600))
+LIVE_INTERVAL_MS = int(os.environ.get("DASH_LIVE_INTERVAL_MS", 1000))
+
+
+class LiveStore:
+    """Live ring buffers for one run, plus the growing files that feed them."""
+
+    def __init__(self, capacity=LIVE_MAX_POINTS, run="live"):
+        self.run = run
+        self.telemetry = TelemetryStore(capacity)
+        self._sources = []
+        self._poll_lock = threading.Lock()
+        self._last_poll = 0.0
+
+    def series(self, variant, metric):
+        """RingBuffer with columns ("Time", metric)."""
+        return self.telemetry.buffer(self.run, variant, metric)
+
+    def append(self, variant, metric, x, y):
+        """Append one point or equal-length arrays of points."""
+        self.telemetry.append(self.run, variant, metric, x, y)
+
+    def frames(self, variants, metric, seconds=None):
+        return self.telemetry.frames(self.run, variants, metric, seconds)
+
+    def follow(self, reader, variant, metrics, x_col="Time"):
+        """Feed `metrics` from a tail reader whose read() returns {column: new values}."""
+        self._sources.append((reader, variant, list(metrics), x_col))
+
+    def follow_csv(self, path, variant, metrics, x_col="Time"):
+        """Feed `metrics` (CSV column names) of a growing CSV into this store."""
+        self.follow(CsvTailReader(path), variant, metrics, x_col)
+
+    def poll(self, min_interval=LIVE_INTERVAL_MS / 2000):
+        """Read new rows from followed files; rate-limited across concurrent callers."""
+        if not self._sources or not self._poll_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            if now - self._last_poll < min_interval:
+                return
+            self._last_poll = now
+            for reader, variant, metrics, x_col in self._sources:
+                rows = reader.read()
+                if x_col not in rows or not len(rows[x_col]):
+                    continue
+                for metric in metrics:
+                    if metric in rows:
+                        self.append(variant, metric, rows[x_col], rows[metric])
+        finally:
+            self._poll_lock.release()
+
+
+store = LiveStore()
+
+
+# ---- Dash Helpers ----
+def empty_frames(legends, y_label, x_label="Time"):
+    """Zero-length frames so live figures start with their legends in place."""
+    return {legend: pd.DataFrame({x_label: [], y_label: []}) for legend in legends}
+
+
+def _cursor_key(variant, metric):
+    return f"{variant}\x1f{metric}"
+
+
+def extend_data(specs, cursors, live_store=None, max_points=LIVE_MAX_POINTS):
+    """
+    New points for every graph since the client's cursors.
+
+    `specs` maps graph id -> (legends in trace order, metric); `cursors` maps
+    each trace to the last Time it was sent. Returns
+    ({graph id: extendData payload or None}, updated cursors).
+    """
+    live_store = live_store if live_store is not None else store
+    live_store.poll()
+    cursors = dict(cursors or {})
+    payloads = {}
+    for graph_id, (legends, metric) in specs.items():
+        xs, ys, traces = [], [], []
+        for i, legend in enumerate(legends):
+            key = _cursor_key(legend, metric)
+            rows = live_store.series(legend, metric).after(cursors.get(key), copy=True)
+            if len(rows["Time"]):
+                cursors[key] = float(rows["Time"][-1])
+                xs.append(rows["Time"].tolist())
+                ys.append(rows[metric].tolist())
+                traces.append(i)
+        payloads[graph_id] = ({"x": xs, "y": ys}, traces, max_points) if traces else None
+    return payloads, cursors
@@ -1,8 +1,8 @@
 import dash
-from dash import dcc, html, Input, Output
-import plotly.express as px
-import pandas as pd
-import numpy as np
+from dash import dcc, html, Input, Output, State
+from data_cache import load_csv
+from encoding import encode_figure
+from traces import line_figure
 
 # ---- Step 1: Assume the following DataFrames are already defined ----
 # Each DataFrame contains "Time" and either "SmoothedRTT" or "Throughput (Mbit/s)"
@@ -10,16 +10,16 @@ import numpy as np
 # Example dummy DataFrames (replace with your real ones)
 # Replace these with: tfcubic, utf, baseline_propagation_delay_df, baseline_Throuhgput_df
 
-utf_rtt = pd.read_csv('./graph_data/udp_prague_rtt.csv')
-tfcubic_rtt = pd.read_csv('./graph_data/cubic_rtt.csv')
-baseline_propagation_delay_df = pd.read_csv('./graph_data/baseline_propagation_delay_df.csv')
+utf_rtt = load_csv('./graph_data/udp_prague_rtt.csv')
+tfcubic_rtt = load_csv('./graph_data/cubic_rtt.csv')
+baseline_propagation_delay_df = load_csv('./graph_data/baseline_propagation_delay_df.csv')
 
-baseline_throuhgput_df = pd.read_csv('./graph_data/baseline_thrpt.csv')
-tfcubic_thrpt = pd.read_csv('./graph_data/cubic_thrpt.csv')
-utf_thrpt = pd.read_csv('./graph_data/udp_prague_thrpt.csv')
+baseline_throuhgput_df = load_csv('./graph_data/baseline_thrpt.csv')
+tfcubic_thrpt = load_csv('./graph_data/cubic_thrpt.csv')
+utf_thrpt = load_csv('./graph_data/udp_prague_thrpt.csv')
 
-tfcubic_loss = pd.read_csv('./graph_data/cubic_loss.csv')
-utf_loss = pd.read_csv('./graph_data/udp_prague_loss.csv')
+tfcubic_loss = load_csv('./graph_data/cubic_loss.csv')
+utf_loss = load_csv('./graph_data/udp_prague_loss.csv')
 
 
 # ---- Step 2: Bundle data for RTT, throughput, and loss ----
@@ -42,8 +42,46 @@ loss_paths = {
 }
 
 
-# ---- Step 3: Dash App ----
+# ---- Step 3: Prepare Figures ----
+def update_comparison_graph(metric_type):
+    if metric_type == "RTT":
+        data_dict = rtt_paths
+        y_label = "SmoothedRTT"
+        title = "RTT Over Time"
+        y_axis_title = "RTT (ms)"
+    elif metric_type == "Throughput (Mbit/s)":
+        data_dict = thrpt_paths
+        y_label = "Throughput (Mbit/s)"
+        title = "Throughput Over Time"
+        y_axis_title = "Throughput (Mbps)"
+    elif metric_type == "Lost_Packets": # New condition for Loss
+        data_dict = loss_paths
+        y_label = "Loss" # Assuming the column name for loss is "Loss"
+        title = "Packet Loss Over Time"
+        y_axis_title = "Packet Loss"
+
+    # One trace per variant; switches to WebGL above traces.WEBGL_THRESHOLD points
+    fig = line_figure(
+        data_dict,
+        y_label,
+        legend_title="Variant",
+        mode="lines+markers",
+        title=title
+    )
+    fig.update_layout(xaxis_title="Time", yaxis_title=y_axis_title)
+    return fig
+
+
+# All three figures are built once here and shipped to the browser in a
+# dcc.Store with binary-encoded trace arrays; switching metrics is then
+# handled entirely client-side.
+METRIC_TYPES = ["RTT", "Throughput (Mbit/s)", "Lost_Packets"]
+metric_figures = {m: encode_figure(update_comparison_graph(m)) for m in METRIC_TYPES}
+
+
+# ---- Step 4: Dash App ----
 app = dash.Dash(__name__)
+server = app.server  # WSGI entry point, see serve.py
 app.title = "RTT, Throughput, and Packet Loss Comparison"
 
 # app.layout = html.Div([
@@ -103,7 +141,8 @@ app.layout = html.Div([
             value='RTT',
             clearable=False,
             style={'width': '300px', 'margin': '0 auto'}
-        )
+        ),
+        dcc.Store(id="metric-figures", data=metric_figures)
     ], style={
         "backgroundColor": "#ecf0f1",
         "padding": "15px",
@@ -178,56 +217,18 @@ app.layout = html.Div([
 })
 
 
-
-# ---- Step 4: Callback ----
-@app.callback(
+# ---- Step 5: Clientside Metric Switch ----
+app.clientside_callback(
+    """
+    function(metricType, figures) {
+        return figures[metricType];
+    }
+    """,
     Output("comparison-graph", "figure"),
-    Input("metric-type", "value")
+    Input("metric-type", "value"),
+    State("metric-figures", "data")
 )
-def update_comparison_graph(metric_type):
-    if metric_type == "RTT":
-        data_dict = rtt_paths
-        y_label = "SmoothedRTT"
-        title = "RTT Over Time"
-        y_axis_title = "RTT (ms)"
-    elif metric_type == "Throughput (Mbit/s)":
-        data_dict = thrpt_paths
-        y_label = "Throughput (Mbit/s)"
-        title = "Throughput Over Time"
-        y_axis_title = "Throughput (Mbps)"
-    elif metric_type == "Lost_Packets": # New condition for Loss
-        data_dict = loss_paths
-        y_label = "Loss" # Assuming the column name for loss is "Loss"
-        title = "Packet Loss Over Time"
-        y_axis_title = "Packet Loss"
-
-    # Combine data into one DataFrame with "Variant" column
-    # Ensure that `y_label` exists in the dataframes, otherwise assign a dummy column if not present.
-    combined_data_frames = []
-    for name, df in data_dict.items():
-        if y_label not in df.columns:
-            # If the y_label column is not present, add a dummy column
-            # This handles cases where dataframes might not have all metric columns
-            # For a real application, ensure your CSVs have consistent column names
-            df_copy = df.copy()
-            df_copy[y_label] = 0 # Placeholder: consider how to handle missing data appropriately
-            combined_data_frames.append(df_copy[["Time", y_label]].assign(Variant=name))
-        else:
-            combined_data_frames.append(df[["Time", y_label]].assign(Variant=name))
-
-    combined = pd.concat(combined_data_frames)
-
-    fig = px.line(
-        combined,
-        x="Time",
-        y=y_label,
-        color="Variant",
-        title=title,
-        markers=True
-    )
-    fig.update_layout(xaxis_title="Time", yaxis_title=y_axis_title)
-    return fig
 
-# ---- Step 5: Run ----
+# ---- Step 6: Run ----
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -2,18 +2,19 @@ import dash
 from dash import dcc, html
 import plotly.express as px
 import pandas as pd
+from data_cache import load_csv
 
 # ---- Load CSVs ----
-utf_rtt = pd.read_csv('./graph_data/udp_prague_rtt.csv')
-tfcubic_rtt = pd.read_csv('./graph_data/cubic_rtt.csv')
-baseline_propagation_delay_df = pd.read_csv('./graph_data/baseline_propagation_delay_df.csv')
+utf_rtt = load_csv('./graph_data/udp_prague_rtt.csv')
+tfcubic_rtt = load_csv('./graph_data/cubic_rtt.csv')
+baseline_propagation_delay_df = load_csv('./graph_data/baseline_propagation_delay_df.csv')
 
-baseline_throuhgput_df = pd.read_csv('./graph_data/baseline_thrpt.csv')
-tfcubic_thrpt = pd.read_csv('./graph_data/cubic_thrpt.csv')
-utf_thrpt = pd.read_csv('./graph_data/udp_prague_thrpt.csv')
+baseline_throuhgput_df = load_csv('./graph_data/baseline_thrpt.csv')
+tfcubic_thrpt = load_csv('./graph_data/cubic_thrpt.csv')
+utf_thrpt = load_csv('./graph_data/udp_prague_thrpt.csv')
 
-tfcubic_loss = pd.read_csv('./graph_data/cubic_loss.csv')
-utf_loss = pd.read_csv('./graph_data/udp_prague_loss.csv')
+tfcubic_loss = load_csv('./graph_data/cubic_loss.csv')
+utf_loss = load_csv('./graph_data/udp_prague_loss.csv')
 
 # ---- Bundle Data ----
 rtt_paths = {
@@ -74,6 +75,7 @@ loss_fig.update_layout(
 
 # ---- Dash App Layout ----
 app = dash.Dash(__name__)
+server = app.server  # WSGI entry point, see serve.py
 app.title = "L4S - Starlink Impact Visualization"
 
 demo_title = "Network Telemetry Visualization for Low Latency, Low Loss, Scalable Throughput (L4S) over Starlink Network"
@@ -1,79 +1,82 @@
+import os
 import dash
-from dash import dcc, html
-import plotly.express as px
-import pandas as pd
-
-# ---- Load CSVs ----
-utf_rtt = pd.read_csv('./graph_data/udp_prague_rtt.csv')
-tfcubic_rtt = pd.read_csv('./graph_data/cubic_rtt.csv')
-baseline_propagation_delay_df = pd.read_csv('./graph_data/baseline_propagation_delay_df.csv')
-
-baseline_throuhgput_df = pd.read_csv('./graph_data/baseline_thrpt.csv')
-tfcubic_thrpt = pd.read_csv('./graph_data/cubic_thrpt.csv')
-utf_thrpt = pd.read_csv('./graph_data/udp_prague_thrpt.csv')
-
-tfcubic_loss = pd.read_csv('./graph_data/cubic_loss.csv')
-utf_loss = pd.read_csv('./graph_data/udp_prague_loss.csv')
+from dash import dcc, html, Input, Output, State
+from dash.exceptions import PreventUpdate
+import live
+from compression import install_compression
+from downsample import relayout_x_range
+from encoding import encode_figure
+from figure_cache import dataset_version
+from prague_ingest import PragueTailReader
+from pyramid import pyramid_frames
+from registry import DatasetRegistry
+from serialization import LayoutCache, enable_fast_json
+from traces import line_figure
+
+# Live mode streams new points from live.store instead of plotting finished runs.
+LIVE_MODE = os.environ.get("DASH_LIVE") == "1"
 
 # ---- Bundle Data ----
-rtt_paths = {
-    "CUBIC": tfcubic_rtt,
-    "L4S": utf_rtt,
-    "Propagation Delay": baseline_propagation_delay_df
-}
-thrpt_paths = {
-    "CUBIC": tfcubic_thrpt,
-    "L4S": utf_thrpt,
-    "Bandwidth Capacity": baseline_throuhgput_df
-}
-loss_paths = {
-    "CUBIC": tfcubic_loss,
-    "L4S": utf_loss,
-}
-
-# ---- Utility: Combine Data ----
-def prepare_graph_data(data_dict, y_label, label_fallback=0):
-    combined = []
-    for name, df in data_dict.items():
-        df_copy = df.copy()
-        if y_label not in df_copy.columns:
-            df_copy[y_label] = label_fallback
-        combined.append(df_copy[["Time", y_label]].assign(Legend=name))
-    return pd.concat(combined)
+# Series are read lazily, and only the plotted columns, when a figure first needs them.
+registry = DatasetRegistry()
+run = registry.run(os.environ.get("GRAPH_RUN", "graph_data"))
+
+rtt_paths = run.frames({
+    "CUBIC": "cubic_rtt",
+    "L4S": "udp_prague_rtt",
+    "Propagation Delay": "baseline_propagation_delay_df"
+}, columns=["Time", "SmoothedRTT"])
+thrpt_paths = run.frames({
+    "CUBIC": "cubic_thrpt",
+    "L4S": "udp_prague_thrpt",
+    "Bandwidth Capacity": "baseline_thrpt"
+}, columns=["Time", "Throughput (Mbit/s)"])
+loss_paths = run.frames({
+    "CUBIC": "cubic_loss",
+    "L4S": "udp_prague_loss",
+}, columns=["Time", "Loss"])
 
 # ---- Prepare Figures ----
-rtt_fig = px.line(
-    prepare_graph_data(rtt_paths, "SmoothedRTT"),
-    x="Time", y="SmoothedRTT", color="Legend"
-)
-rtt_fig.update_layout(
-    title="",
-    xaxis_title="Time (s)",
-    yaxis_title="Round-Trip Time (ms)"
-)
-
-thrpt_fig = px.line(
-    prepare_graph_data(thrpt_paths, "Throughput (Mbit/s)"),
-    x="Time", y="Throughput (Mbit/s)", color="Legend"
-)
-thrpt_fig.update_layout(
-    title="",
-    xaxis_title="Time (s)",
-    yaxis_title="Throughput (Mbps)"
-)
-
-loss_fig = px.line(
-    prepare_graph_data(loss_paths, "Loss"),
-    x="Time", y="Loss", color="Legend"
-)
-loss_fig.update_layout(
-    title="",
-    xaxis_title="Time (s)",
-    yaxis_title="Packet Loss"
-)
+# graph id -> (data, y column, y-axis title)
+FIGURE_SPECS = {
+    "thrpt-graph": (thrpt_paths, "Throughput (Mbit/s)", "Throughput (Mbps)"),
+    "rtt-graph": (rtt_paths, "SmoothedRTT", "Round-Trip Time (ms)"),
+    "loss-graph": (loss_paths, "Loss", "Packet Loss"),
+}
+
+# DASH_FLOW_VIEW=per-flow splits multi-stream runs (e.g. imported iperf3 tests)
+# into one trace per flow; the default plots their per-interval aggregate.
+if os.environ.get("DASH_FLOW_VIEW") == "per-flow":
+    FIGURE_SPECS = {
+        graph_id: (data_dict.per_flow(y_label), y_label, y_axis_title)
+        for graph_id, (data_dict, y_label, y_axis_title) in FIGURE_SPECS.items()
+    }
+
+
+def build_figure(graph_id, x_range=None):
+    """Figure for `graph_id` over x_range, answered from the series pyramids."""
+    data_dict, y_label, y_axis_title = FIGURE_SPECS[graph_id]
+    if LIVE_MODE:
+        frames = live.empty_frames(data_dict, y_label)  # filled by extendData
+    else:
+        frames = pyramid_frames(data_dict, y_label, x_range)
+    fig = line_figure(
+        frames, y_label,
+        title="",
+        xaxis_title="Time (s)",
+        yaxis_title=y_axis_title,
+        uirevision=graph_id  # keep the user's zoom when the figure is replaced
+    )
+    return encode_figure(fig)
+
+
+thrpt_fig = build_figure("thrpt-graph")
+rtt_fig = build_figure("rtt-graph")
+loss_fig = build_figure("loss-graph")
 
 # ---- Dash App Layout ----
 app = dash.Dash(__name__)
+server = app.server  # WSGI entry point, see serve.py
 app.title = "L4S - Starlink Impact Visualization"
 
 demo_title = "Demo: Network Telemetry for Low Latency, Low Loss, Scalable Throughput (L4S) over Starlink Network"
@@ -126,7 +129,7 @@ app.layout = html.Div([
     html.Div([  # First Row: Throughput + Simulation
         html.Div([
             html.Div("Throughput (Mbps) vs Time", style=header_style),
-            dcc.Graph(figure=thrpt_fig, style={"height": "420px"})
+            dcc.Graph(id="thrpt-graph", figure=thrpt_fig, style={"height": "420px"})
         ], style={**common_style, "width": "50%", "marginRight": "2%"}),
 
         html.Div([
@@ -162,14 +165,18 @@ app.layout = html.Div([
     html.Div([  # Second Row: RTT + Packet Loss
         html.Div([
             html.Div("RTT (ms) vs Time", style=header_style),
-            dcc.Graph(figure=rtt_fig, style={"height": "420px"})
+            dcc.Graph(id="rtt-graph", figure=rtt_fig, style={"height": "420px"})
         ], style={**common_style, "width": "50%", "marginRight": "2%"}),
 
         html.Div([
             html.Div("Packet Loss vs Time", style=header_style),
-            dcc.Graph(figure=loss_fig, style={"height": "420px"})
+            dcc.Graph(id="loss-graph", figure=loss_fig, style={"height": "420px"})
         ], style={**common_style, "width": "48%"})
-    ], style={"display": "flex", "marginBottom": "30px"})
+    ], style={"display": "flex", "marginBottom": "30px"}),
+
+    # Live mode polling; the store holds the last Time sent per trace.
+    dcc.Interval(id="live-interval", interval=live.LIVE_INTERVAL_MS, disabled=not LIVE_MODE),
+    dcc.Store(id="live-cursors")
 ], style={
     "fontFamily": "Segoe UI, sans-serif",
     "padding": "30px",
@@ -180,6 +187,67 @@ app.layout = html.Div([
 
 
 
+# ---- Response Encoding ----
+# The layout is encoded and compressed once and revalidated with an ETag tied
+# to the dataset content; callback responses are compressed per request.
+if os.environ.get("DASH_FAST_JSON") == "1":
+    enable_fast_json()
+layout_cache = LayoutCache(app, version=lambda: dataset_version(rtt_paths, thrpt_paths, loss_paths))
+install_compression(app)
+
+
+# ---- Zoom-Dependent Resampling ----
+# Each zoom is answered from the coarsest pyramid level that still resolves the
+# visible range; zooming in far enough returns the raw points.
+def register_zoom_callback(graph_id):
+    @app.callback(
+        Output(graph_id, "figure"),
+        Input(graph_id, "relayoutData"),
+        prevent_initial_call=True
+    )
+    def rescale(relayout_data):
+        changed, x_range = relayout_x_range(relayout_data)
+        if not changed:
+            raise PreventUpdate
+        return build_figure(graph_id, x_range)
+
+
+# ---- Live Updates ----
+# Only points added since the last poll are sent, appended through extendData.
+def live_update(n_intervals, cursors):
+    specs = {
+        graph_id: (list(data_dict), y_label)
+        for graph_id, (data_dict, y_label, _) in FIGURE_SPECS.items()
+    }
+    payloads, cursors = live.extend_data(specs, cursors)
+    return [payloads[g] or dash.no_update for g in FIGURE_SPECS] + [cursors]
+
+
+if LIVE_MODE:
+    # Tail the run's CSVs; rows the test appends show up on the next poll.
+    # DASH_LIVE_PRAGUE_LOG feeds the L4S traces from the raw UDP-Prague log instead.
+    prague_log = os.environ.get("DASH_LIVE_PRAGUE_LOG")
+    if prague_log:
+        live.store.follow(PragueTailReader(prague_log), "L4S",
+                          [y_label for _, y_label, _ in FIGURE_SPECS.values()])
+    for data_dict, y_label, _ in FIGURE_SPECS.values():
+        for legend in data_dict:
+            path = data_dict.handle(legend).path
+            if path.endswith(".csv") and not (prague_log and legend == "L4S"):
+                live.store.follow_csv(path, legend, [y_label])
+
+    app.callback(
+        [Output(graph_id, "extendData") for graph_id in FIGURE_SPECS]
+        + [Output("live-cursors", "data")],
+        Input("live-interval", "n_intervals"),
+        State("live-cursors", "data")
+    )(live_update)
+else:
+    for graph_id in FIGURE_SPECS:
+        register_zoom_callback(graph_id)
+
+
 # ---- Run App ----
+# Development server only; use serve.py for production. DASH_DEBUG=0 turns off dev tools.
 if __name__ == "__main__":
-    app.run(debug=True)
+    app.run(debug=os.environ.get("DASH_DEBUG", "1") != "0")
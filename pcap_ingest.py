@@ -0,0 +1,439 @@
+"""
+pcap / pcapng ingestion into the dashboard's schema.
+
+The capture is memory-mapped and only the record boundaries are walked in
+Python: a sequential length chain, one struct.unpack_from per record (the
+length of each record is only known after reading the one before). Every
+header field is then gathered for all packets at once with NumPy fancy
+indexing into a structured array (PACKET_DTYPE), and flows are grouped with
+np.lexsort over the 5-tuple fields.
+
+From that array, per flow (5-tuple, one direction) and per time bin:
+
+    Throughput (Mbit/s)   IP bytes on the wire
+    SmoothedRTT           mean TCP RTT sample (ms): time from a segment's
+                          first transmission to the first ACK covering it
+                          (Karn's rule: segments that were ever resent
+                          give none), matched with searchsorted on the
+                          cumulative ACK
+    Mark_pct              CE-marked share of ECN-capable packets (%), with
+                          Mark_Marked / Mark_Total counts
+    Loss, Lost_pct        retransmitted TCP segments, count and % of data
+                          segments (NaN for UDP, which carries no sequence)
+
+The run stores the aggregate across flows in those columns and the
+per-flow values as "<column> per flow" (bin x flow) columns for the
+dashboard's per-flow view. Supported link types: Ethernet (with one VLAN
+tag), Linux cooked (SLL, SLL2) and raw IPv4/IPv6. IP fragments and IPv6
+extension headers are not followed.
+
+    python pcap_ingest.py capture.pcapng [out.series] [--bin 1.0]
+"""
+import argparse
+import ipaddress
+import os
+import struct
+from array import array
+
+import numpy as np
+from iperf3_ingest import aggregate_streams
+from series_store import SUFFIX, per_flow, write_run
+
+BIN_SECONDS = 1.0
+MAX_FLOWS = 32
+
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+LINKTYPE_LINUX_SLL2 = 276
+
+TCP_FLAG_ACK = 0x10
+PACKET_DTYPE = np.dtype([
+    ("time", "f8"), ("version", "u1"), ("proto", "u1"), ("ecn", "u1"), ("flags", "u1"),
+    ("ip_len", "i8"), ("payload", "i8"),
+    ("src_hi", "u8"), ("src_lo", "u8"), ("dst_hi", "u8"), ("dst_lo", "u8"),
+    ("sport", "u2"), ("dport", "u2"), ("seq", "u4"), ("ack", "u4"),
+])
+FLOW_FIELDS = ("version", "proto", "src_hi", "src_lo", "dst_hi", "dst_lo", "sport", "dport")
+
+
+# ---- Record Walking ----
+def _read_pcap(buf):
+    magic = bytes(buf[:4])
+    endian = {b"\xd4\xc3\xb2\xa1": "<", b"\xa1\xb2\xc3\xd4": ">",
+              b"\x4d\x3c\xb2\xa1": "<", b"\xa1\xb2\x3c\x4d": ">"}[magic]
+    scale = 1e-9 if magic in (b"\x4d\x3c\xb2\xa1", b"\xa1\xb2\x3c\x4d") else 1e-6
+    linktype = struct.unpack_from(endian + "I", buf, 20)[0] & 0x0FFFFFFF
+
+    record = struct.Struct(endian + "IIII")
+    starts = array("q")
+    pos, size = 24, len(buf)
+    while pos + 16 <= size:
+        caplen = record.unpack_from(buf, pos)[2]
+        if pos + 16 + caplen > size:
+            break  # cut off at the end of the file, e.g. tcpdump was killed
+        starts.append(pos)
+        pos += 16 + caplen
+
+    starts = np.frombuffer(starts, dtype=np.int64)
+    ts = _u32(buf, starts, endian) + _u32(buf, starts + 4, endian) * scale
+    caplen = _u32(buf, starts + 8, endian).astype(np.int64)
+    return ts, starts + 16, caplen, np.full(len(starts), linktype, dtype=np.int64)
+
+
+def _u32(buf, idx, endian):
+    """Unsigned 32-bit record header fields at every index in `idx`."""
+    values = _be(buf, idx, 4).astype(np.uint32)
+    return values.byteswap() if endian == "<" else values
+
+
+def _read_pcapng(buf):
+    ts, offsets, caplens, links = array("d"), array("q"), array("q"), array("q")
+    interfaces = []  # (linktype, seconds per tick) per interface of the current section
+    endian = "<"
+    pos, size = 0, len(buf)
+    while pos + 12 <= size:
+        block_type = struct.unpack_from(endian + "I", buf, pos)[0]
+        if block_type == 0x0A0D0D0A:  # section header: byte order may change
+            endian = "<" if bytes(buf[pos + 8:pos + 12]) == b"\x4d\x3c\x2b\x1a" else ">"
+            interfaces = []
+        length = struct.unpack_from(endian + "I", buf, pos + 4)[0]
+        if length < 12 or pos + length > size:
+            break
+        if block_type == 1:  # interface description
+            linktype = struct.unpack_from(endian + "H", buf, pos + 8)[0]
+            interfaces.append((linktype, _if_tsresol(buf, pos + 16, pos + length - 4, endian)))
+        elif block_type == 6:  # enhanced packet
+            iface, hi, lo, caplen = struct.unpack_from(endian + "IIII", buf, pos + 8)
+            linktype, tick = interfaces[iface]
+            ts.append(((hi << 32) | lo) * tick)
+            offsets.append(pos + 28)
+            caplens.append(caplen)
+            links.append(linktype)
+        pos += length
+    return tuple(np.frombuffer(a, dtype=a.typecode) for a in (ts, offsets, caplens, links))
+
+
+def _if_tsresol(buf, pos, end, endian):
+    while pos + 4 <= end:
+        code, length = struct.unpack_from(endian + "HH", buf, pos)
+        if code == 0:
+            break
+        if code == 9:
+            value = buf[pos + 4]
+            return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+        pos += 4 + (length + 3) // 4 * 4
+    return 1e-6
+
+
+def read_records(path):
+    """
+    Memory-map a capture and locate its packets.
+
+    Returns (buf, ts seconds, data offsets, captured lengths, link types);
+    the arrays have one entry per packet.
+    """
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(buf) < 24:
+        raise ValueError(f"{path}: too short to be a capture")
+    if bytes(buf[:4]) == b"\x0a\x0d\x0d\x0a":
+        ts, offsets, caplens, links = _read_pcapng(buf)
+    else:
+        try:
+            ts, offsets, caplens, links = _read_pcap(buf)
+        except KeyError:
+            raise ValueError(f"{path}: not a pcap or pcapng file") from None
+    return buf, ts, offsets, caplens, links
+
+
+# ---- Header Decoding ----
+def _be(buf, idx, nbytes):
+    """Big-endian unsigned integers of `nbytes` at every index in `idx`."""
+    idx = np.minimum(idx, len(buf) - nbytes)
+    out = np.zeros(len(idx), dtype=np.uint64)
+    for k in range(nbytes):
+        out = (out << np.uint64(8)) | buf[idx + k].astype(np.uint64)
+    return out
+
+
+def parse_packets(buf, ts, offsets, caplens, links):
+    """Decode link/IP/TCP/UDP headers of every packet into a PACKET_DTYPE array (IP only)."""
+    end = offsets + caplens
+    ethertype = np.zeros(len(offsets), dtype=np.uint64)
+    l3 = offsets.copy()
+
+    eth = links == LINKTYPE_ETHERNET
+    ethertype[eth] = _be(buf, offsets[eth] + 12, 2)
+    l3[eth] += 14
+    vlan = eth & (ethertype == 0x8100)
+    ethertype[vlan] = _be(buf, offsets[vlan] + 16, 2)
+    l3[vlan] += 4
+
+    sll = links == LINKTYPE_LINUX_SLL
+    ethertype[sll] = _be(buf, offsets[sll] + 14, 2)
+    l3[sll] += 16
+    sll2 = links == LINKTYPE_LINUX_SLL2
+    ethertype[sll2] = _be(buf, offsets[sll2], 2)
+    l3[sll2] += 20
+
+    raw = np.isin(links, (LINKTYPE_RAW, LINKTYPE_IPV4, LINKTYPE_IPV6))
+    nibble = _be(buf, l3[raw], 1) >> np.uint64(4)
+    ethertype[raw] = np.where(nibble == 4, 0x0800, np.where(nibble == 6, 0x86DD, 0))
+
+    v4 = (ethertype == 0x0800) & (l3 + 20 <= end)
+    v6 = (ethertype == 0x86DD) & (l3 + 40 <= end)
+    keep = v4 | v6
+    l3, end, v4, v6 = l3[keep], end[keep], v4[keep], v6[keep]
+
+    pkts = np.zeros(len(l3), dtype=PACKET_DTYPE)
+    pkts["time"] = ts[keep]
+    b0 = _be(buf, l3, 1)
+    b1 = _be(buf, l3 + 1, 1)
+    pkts["version"] = np.where(v4, 4, 6)
+    pkts["ecn"] = np.where(v4, b1, (b0 << np.uint64(4)) | (b1 >> np.uint64(4))) & np.uint64(3)
+
+    ihl = ((b0 & np.uint64(0x0F)) * np.uint64(4)).astype(np.int64)
+    frag = _be(buf, l3 + 6, 2) & np.uint64(0x1FFF)
+    pkts["ip_len"] = np.where(v4, _be(buf, l3 + 2, 2), _be(buf, l3 + 4, 2) + np.uint64(40))
+    pkts["proto"] = np.where(v4, _be(buf, l3 + 9, 1), _be(buf, l3 + 6, 1))
+    pkts["src_hi"] = np.where(v4, 0, _be(buf, l3 + 8, 8))
+    pkts["src_lo"] = np.where(v4, _be(buf, l3 + 12, 4), _be(buf, l3 + 16, 8))
+    pkts["dst_hi"] = np.where(v4, 0, _be(buf, l3 + 24, 8))
+    pkts["dst_lo"] = np.where(v4, _be(buf, l3 + 16, 4), _be(buf, l3 + 32, 8))
+    l4 = l3 + np.where(v4, ihl, 40)
+    l4_ok = ~(v4 & (frag != 0))
+
+    tcp = l4_ok & (pkts["proto"] == 6) & (l4 + 20 <= end)
+    udp = l4_ok & (pkts["proto"] == 17) & (l4 + 8 <= end)
+    ports = tcp | udp
+    pkts["sport"][ports] = _be(buf, l4[ports], 2)
+    pkts["dport"][ports] = _be(buf, l4[ports] + 2, 2)
+    pkts["seq"][tcp] = _be(buf, l4[tcp] + 4, 4)
+    pkts["ack"][tcp] = _be(buf, l4[tcp] + 8, 4)
+    pkts["flags"][tcp] = _be(buf, l4[tcp] + 13, 1)
+    tcp_hlen = ((_be(buf, l4[tcp] + 12, 1) >> np.uint64(4)) * np.uint64(4)).astype(np.int64)
+    pkts["payload"][tcp] = pkts["ip_len"][tcp] - (l4[tcp] - l3[tcp]) - tcp_hlen
+    pkts["payload"][udp] = _be(buf, l4[udp] + 4, 2).astype(np.int64) - 8
+    np.maximum(pkts["payload"], 0, out=pkts["payload"])
+    return pkts[np.argsort(pkts["time"], kind="stable")]
+
+
+def read_packets(path):
+    """parse_packets() over a whole capture file."""
+    return parse_packets(*read_records(path))
+
+
+# ---- Flow Metrics ----
+def _unwrap32(values, base):
+    """32-bit sequence numbers as int64 offsets from `base`, unwrapped across wraps."""
+    if not len(values):
+        return np.zeros(0, dtype=np.int64)
+    rel = (values.astype(np.int64) - int(base)) & 0xFFFFFFFF
+    first = ((rel[0] + 2**31) & 0xFFFFFFFF) - 2**31
+    steps = ((np.diff(rel) + 2**31) & 0xFFFFFFFF) - 2**31
+    return np.concatenate(([first], first + np.cumsum(steps)))
+
+
+def _tcp_flow(pkts, fwd, rev):
+    """
+    (retransmitted packet indices, RTT sample packet indices, RTT seconds)
+    for the data direction `fwd` (packet indices) acked by `rev`.
+    """
+    data = fwd[pkts["payload"][fwd] > 0]
+    if not len(data):
+        return data, data, np.zeros(0)
+    isn = pkts["seq"][data[0]]
+    start = _unwrap32(pkts["seq"][data], isn)
+    stop = start + pkts["payload"][data]
+    highest = np.maximum.accumulate(np.concatenate(([start[0]], stop[:-1])))
+    retrans = stop <= highest
+
+    acks = rev[(pkts["flags"][rev] & TCP_FLAG_ACK) != 0]
+    if not len(acks):
+        return data[retrans], data[:0], np.zeros(0)
+    covered = np.maximum.accumulate(_unwrap32(pkts["ack"][acks], isn))
+    t_ack = pkts["time"][acks]
+
+    # Karn's rule: a segment that was retransmitted gives no sample, neither
+    # from the copies nor from the original send. First sends have rising
+    # start and stop, so the originals overlapping each retransmitted range
+    # are one slice [lo, hi), marked through a difference array.
+    fresh_start, fresh_stop = start[~retrans], stop[~retrans]
+    lo = np.searchsorted(fresh_stop, start[retrans], side="right")
+    hi = np.searchsorted(fresh_start, stop[retrans], side="left")
+    marks = np.zeros(len(fresh_start) + 1, dtype=np.int64)
+    np.add.at(marks, lo, 1)
+    np.add.at(marks, np.maximum(hi, lo), -1)
+    resent = np.cumsum(marks[:-1]) > 0
+
+    fresh = data[~retrans][~resent]
+    t_seg = pkts["time"][fresh]
+    first_cover = np.searchsorted(covered, fresh_stop[~resent], side="left")
+    after_send = np.searchsorted(t_ack, t_seg, side="right")
+    # The first covering ACK must come after the send; otherwise the sample is ambiguous.
+    ok = (first_cover < len(acks)) & (first_cover >= after_send)
+    rtt = t_ack[first_cover[ok]] - t_seg[ok]
+    return data[retrans], fresh[ok], rtt
+
+
+def _address(version, hi, lo):
+    if version == 4:
+        return str(ipaddress.IPv4Address(int(lo)))
+    return f"[{ipaddress.IPv6Address((int(hi) << 64) | int(lo))}]"
+
+
+def flow_label(key):
+    proto = {6: "tcp", 17: "udp"}.get(int(key["proto"]), str(key["proto"]))
+    src = _address(key["version"], key["src_hi"], key["src_lo"])
+    dst = _address(key["version"], key["dst_hi"], key["dst_lo"])
+    return f"{proto} {src}:{int(key['sport'])}>{dst}:{int(key['dport'])}"
+
+
+def flow_metrics(pkts, bin_seconds=BIN_SECONDS, max_flows=MAX_FLOWS):
+    """
+    Per-bin metrics for the `max_flows` flows carrying the most payload.
+
+    Returns (bin start times, {column: (bins x flows) array}, flow labels).
+    """
+    if not len(pkts):
+        return np.zeros(0), {}, []
+    # Group on the key fields as plain columns; sorting the structured array
+    # itself (np.unique) compares records field by field and is far slower.
+    order = np.lexsort([pkts[f] for f in reversed(FLOW_FIELDS)])
+    same = np.zeros(len(order), dtype=bool)
+    same[1:] = True
+    for f in FLOW_FIELDS:
+        values = pkts[f][order]
+        same[1:] &= values[1:] == values[:-1]
+    first = ~same
+    flow_keys = pkts[list(FLOW_FIELDS)][order[first]]
+    flow_of = np.empty(len(order), dtype=np.int64)
+    flow_of[order] = np.cumsum(first) - 1
+    payload = np.bincount(flow_of, weights=pkts["payload"], minlength=len(flow_keys))
+    chosen = [f for f in np.argsort(-payload, kind="stable")[:max_flows] if payload[f] > 0]
+    column = np.full(len(flow_keys), -1, dtype=np.int64)
+    column[chosen] = np.arange(len(chosen))
+    n_flows = len(chosen)
+
+    t0 = pkts["time"][0]
+    bins = ((pkts["time"] - t0) // bin_seconds).astype(np.int64)
+    n_bins = int(bins[-1]) + 1
+    col = column[flow_of]
+    sel = col >= 0
+
+    def per_bin(mask, weights=None, b=bins, c=col):
+        """(bins x flows) sums of `weights` (counts if None) over packets in `mask`."""
+        w = None if weights is None else weights[mask]
+        return np.bincount(b[mask] * n_flows + c[mask], weights=w,
+                           minlength=n_bins * n_flows).reshape(n_bins, n_flows).astype(np.float64)
+
+    marked = per_bin(sel & (pkts["ecn"] == 3))
+    total = per_bin(sel & (pkts["ecn"] != 0))
+
+    # TCP sequence analysis is vectorized within a flow; the loop is over flows.
+    index = {tuple(flow_keys[i][f] for f in FLOW_FIELDS): i for i in range(len(flow_keys))}
+    bounds = np.append(np.nonzero(first)[0], len(order))
+
+    def members(f):
+        """Packet indices of flow f, in time order (lexsort is stable)."""
+        return order[bounds[f]:bounds[f + 1]]
+
+    retrans, rtt_idx, rtt = [np.zeros(0, np.int64)], [np.zeros(0, np.int64)], [np.zeros(0)]
+    tcp_flows = np.zeros(n_flows, dtype=bool)
+    for f in chosen:
+        k = flow_keys[f]
+        if k["proto"] != 6:
+            continue
+        tcp_flows[column[f]] = True
+        r = index.get((k["version"], k["proto"], k["dst_hi"], k["dst_lo"],
+                       k["src_hi"], k["src_lo"], k["dport"], k["sport"]))
+        rev = members(r) if r is not None else np.zeros(0, np.int64)
+        re_idx, sample_idx, sample_rtt = _tcp_flow(pkts, members(f), rev)
+        retrans.append(re_idx)
+        rtt_idx.append(sample_idx)
+        rtt.append(sample_rtt)
+    retrans, rtt_idx, rtt = (np.concatenate(a) for a in (retrans, rtt_idx, rtt))
+
+    def at(indices):
+        mask = np.zeros(len(pkts), dtype=bool)
+        mask[indices] = True
+        return mask
+
+    segments = per_bin(sel & (pkts["proto"] == 6) & (pkts["payload"] > 0))
+    lost = per_bin(at(retrans))
+    rtt_mask = at(rtt_idx)
+    rtt_weights = np.zeros(len(pkts))
+    rtt_weights[rtt_idx] = rtt * 1000.0
+    rtt_sum, rtt_count = per_bin(rtt_mask, rtt_weights), per_bin(rtt_mask)
+    lost[:, ~tcp_flows] = np.nan
+    segments[:, ~tcp_flows] = np.nan
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        columns = {
+            "Throughput (Mbit/s)": per_bin(sel, pkts["ip_len"].astype(np.float64)) * 8 / bin_seconds / 1e6,
+            "SmoothedRTT": rtt_sum / rtt_count,
+            "Mark_pct": marked / total * 100,
+            "Mark_Marked": marked,
+            "Mark_Total": total,
+            "Lost_pct": lost / segments * 100,
+            "Loss": lost,
+            "_rtt_sum": rtt_sum,
+            "_rtt_count": rtt_count,
+            "_segments": segments,
+        }
+    times = np.arange(n_bins) * bin_seconds
+    return times, columns, [flow_label(flow_keys[f]) for f in chosen]
+
+
+def run_columns(times, flows):
+    """Aggregate columns across flows plus the per_flow() (bin x flow) columns."""
+    def total(name):
+        values = flows[name]
+        return aggregate_streams(values)["sum"] if values.shape[1] else np.full(len(times), np.nan)
+
+    throughput = flows["Throughput (Mbit/s)"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        columns = {
+            "Time": times,
+            "Throughput (Mbit/s)": total("Throughput (Mbit/s)"),
+            "Fairness": aggregate_streams(throughput)["fairness"],
+            "SmoothedRTT": total("_rtt_sum") / total("_rtt_count"),
+            "Mark_pct": total("Mark_Marked") / total("Mark_Total") * 100,
+            "Mark_Marked": total("Mark_Marked"),
+            "Mark_Total": total("Mark_Total"),
+            "Lost_pct": total("Loss") / total("_segments") * 100,
+            "Loss": total("Loss"),
+        }
+    columns.update({per_flow(n): v for n, v in flows.items() if not n.startswith("_")})
+    return columns
+
+
+def ingest_pcap(path, out_path=None, bin_seconds=BIN_SECONDS, max_flows=MAX_FLOWS):
+    """Convert a capture to a series run; returns the run header."""
+    pkts = read_packets(path)
+    times, flows, labels = flow_metrics(pkts, bin_seconds, max_flows)
+    out_path = out_path or os.path.splitext(path)[0] + SUFFIX
+    attrs = {
+        "source": os.path.abspath(path),
+        "capture_start": float(pkts["time"][0]) if len(pkts) else None,
+        "packets": int(len(pkts)),
+        "bin_seconds": bin_seconds,
+        "flows": labels,
+    }
+    if not flows:
+        return write_run(out_path, {"Time": times}, index="Time", attrs=attrs)
+    return write_run(out_path, run_columns(times, flows), index="Time", attrs=attrs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("capture")
+    parser.add_argument("out", nargs="?")
+    parser.add_argument("--bin", type=float, default=BIN_SECONDS, help="bin width in seconds")
+    parser.add_argument("--max-flows", type=int, default=MAX_FLOWS)
+    args = parser.parse_args()
+    header = ingest_pcap(args.capture, args.out, args.bin, args.max_flows)
+    print(f"{args.capture}: {header['attrs']['packets']} packets, "
+          f"{len(header['attrs']['flows'])} flows, {header['length']} bins")
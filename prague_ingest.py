@@ -0,0 +1,127 @@
+"""
+Parser for UDP-Prague client/server text output.
+
+Produces the udp_prague_rtt.csv columns (Time, Throughput (Mbit/s),
+Sent_Mbps, SmoothedRTT, Mark_pct, Mark_Marked, Mark_Total, Lost_pct, Loss,
+Lost_Total) as a series run. The assumed report line, one per interval, is
+
+    [RECVER]: 1.000000 sec, Rcvd: 8.062 Mbps, Sent: 0.127 Mbps, RTT: 7.213 ms,
+    Mark: 0.69% (5/721), Lost: 0.00% (0/721)
+
+(on one line; whitespace and the "[...]:" prefix are free). Other builds
+print other layouts: pass `pattern`, a regex with one named group per column
+(see GROUP_COLUMNS for the names of columns that are not identifiers). Lines
+that don't match are ignored.
+
+Each chunk is parsed with a single findall() and converted per column in
+one astype(). Lines are never split or looped over; the per-line Python work
+left is the tuple findall() builds for each report line.
+
+    python prague_ingest.py client.log [out.series]
+    python prague_ingest.py client.log out.series --follow   # append as it grows
+"""
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+from series_store import SUFFIX, append_run, write_run
+from tail_reader import READ_CHUNK, TailReader, line_chunks
+
+DEFAULT_PATTERN = (
+    rb"(?P<Time>[\d.]+)\s*sec"
+    rb".*?Rcvd:\s*(?P<Throughput>[\d.]+)\s*Mbps"
+    rb".*?Sent:\s*(?P<Sent_Mbps>[\d.]+)\s*Mbps"
+    rb".*?RTT:\s*(?P<SmoothedRTT>[\d.]+)\s*ms"
+    rb".*?Mark:\s*(?P<Mark_pct>[\d.]+)%\s*\((?P<Mark_Marked>\d+)/(?P<Mark_Total>\d+)\)"
+    rb".*?Lost:\s*(?P<Lost_pct>[\d.]+)%\s*\((?P<Loss>\d+)/(?P<Lost_Total>\d+)\)"
+)
+GROUP_COLUMNS = {"Throughput": "Throughput (Mbit/s)"}
+FOLLOW_INTERVAL = 1.0
+
+
+def compile_pattern(pattern=None):
+    """Compiled report-line regex; `pattern` may be str or bytes."""
+    pattern = DEFAULT_PATTERN if pattern is None else pattern
+    if isinstance(pattern, str):
+        pattern = pattern.encode()
+    regex = re.compile(pattern, re.M)
+    if "Time" not in regex.groupindex:
+        raise ValueError("pattern needs a named group 'Time'")
+    return regex
+
+
+def parse_chunk(data, regex):
+    """{column: float array} of the report lines in `data`."""
+    names = sorted(regex.groupindex, key=regex.groupindex.get)
+    columns = [GROUP_COLUMNS.get(name, name) for name in names]
+    rows = regex.findall(data)
+    if not rows:
+        return {column: np.zeros(0) for column in columns}
+    values = np.array(rows, dtype=bytes).reshape(len(rows), len(names))
+    values[values == b""] = b"nan"
+    values = values.astype(np.float64)
+    return {column: values[:, i] for i, column in enumerate(columns)}
+
+
+def parse_log(path, pattern=None, chunk_size=READ_CHUNK):
+    """Parse a whole log in chunks of complete lines."""
+    regex = compile_pattern(pattern)
+    parts = [parse_chunk(chunk, regex) for chunk in line_chunks(path, chunk_size)]
+    parts = parts or [parse_chunk(b"", regex)]
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+def ingest_prague(path, out_path=None, pattern=None):
+    """Convert a UDP-Prague log to a series run; returns the run header."""
+    out_path = out_path or os.path.splitext(path)[0] + SUFFIX
+    return write_run(out_path, parse_log(path, pattern), index="Time",
+                     attrs={"source": os.path.abspath(path), "tool": "udp_prague"})
+
+
+class PragueTailReader(TailReader):
+    """Tails a growing UDP-Prague log; read() returns the new report lines as columns."""
+
+    def __init__(self, path, pattern=None):
+        super().__init__(path)
+        self.regex = compile_pattern(pattern)
+
+    def read(self, max_bytes=READ_CHUNK):
+        return parse_chunk(self.read_lines(max_bytes), self.regex)
+
+
+def follow_prague(path, out_path, pattern=None, interval=FOLLOW_INTERVAL):
+    """
+    Mirror a live log into the run at `out_path` until interrupted: the run
+    is rewritten from the log's start, then new report lines are appended.
+    """
+    reader = PragueTailReader(path, pattern)
+    attrs = {"source": os.path.abspath(path), "tool": "udp_prague"}
+    started = False
+    while True:
+        rows = reader.read()
+        if not started or reader.rotated:
+            write_run(out_path, rows, index="Time", attrs=attrs)
+            started = True
+        elif len(rows["Time"]):
+            append_run(out_path, rows)
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log")
+    parser.add_argument("out", nargs="?")
+    parser.add_argument("--pattern", help="report-line regex with named groups")
+    parser.add_argument("--follow", action="store_true", help="keep appending as the log grows")
+    args = parser.parse_args()
+    out = args.out or os.path.splitext(args.log)[0] + SUFFIX
+    if args.follow:
+        try:
+            follow_prague(args.log, out, args.pattern)
+        except KeyboardInterrupt:
+            pass
+    else:
+        header = ingest_prague(args.log, out, args.pattern)
+        print(f"{args.log}: {header['length']} intervals -> {out}")
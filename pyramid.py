@@ -0,0 +1,225 @@
+"""
+Multi-resolution pyramids for telemetry series.
+
+Level 0 is the raw series. Level k groups FACTOR**k raw points per bucket and
+stores, for each bucket, its first x, min, max, mean, point count and the x
+positions of the min and max. Levels are built once per (series, column),
+saved next to the series' data cache entry, and memory-mapped afterwards.
+Level 1 is built from the raw series BUILD_CHUNK points at a time, and each
+coarser level from the one below, so a memory-mapped run is never copied
+whole.
+
+A range query picks the coarsest level that still yields at least
+max_points / 2 points in the visible range, so answering it costs O(output)
+rather than O(run length).
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from data_cache import cache_path_for, file_stamp, staging_dir, swap_dir
+from downsample import MAX_POINTS, minmax
+
+FACTOR = 4
+MIN_BUCKETS = 64
+BUILD_CHUNK = FACTOR ** 10  # raw points per level-1 pass; a multiple of FACTOR
+FIELDS = ("x", "min", "max", "mean", "count", "x_min", "x_max")
+
+
+# ---- Building ----
+def _base_level(x, y):
+    y = np.asarray(y, dtype=float)
+    valid = ~np.isnan(y)
+    return {
+        "x": np.asarray(x),
+        "min": y,
+        "max": y,
+        "sum": np.where(valid, y, 0.0),
+        "count": valid.astype(np.int64),
+        "x_min": np.asarray(x),
+        "x_max": np.asarray(x),
+    }
+
+
+def _group(values, fill):
+    pad = -len(values) % FACTOR
+    if pad:
+        values = np.concatenate([values, np.full(pad, fill, dtype=values.dtype)])
+    return values.reshape(-1, FACTOR)
+
+
+def _coarsen(level):
+    """Merge every FACTOR consecutive buckets of `level` into one."""
+    lo = _group(np.where(np.isnan(level["min"]), np.inf, level["min"]), np.inf)
+    hi = _group(np.where(np.isnan(level["max"]), -np.inf, level["max"]), -np.inf)
+    rows = np.arange(len(lo))
+    arg_lo = lo.argmin(axis=1)
+    arg_hi = hi.argmax(axis=1)
+
+    count = _group(level["count"], 0).sum(axis=1)
+    empty = count == 0
+    x_min = _group(level["x_min"], level["x_min"][-1])[rows, arg_lo]
+    x_max = _group(level["x_max"], level["x_max"][-1])[rows, arg_hi]
+    return {
+        "x": level["x"][::FACTOR],
+        "min": np.where(empty, np.nan, lo[rows, arg_lo]),
+        "max": np.where(empty, np.nan, hi[rows, arg_hi]),
+        "sum": _group(level["sum"], 0.0).sum(axis=1),
+        "count": count,
+        "x_min": x_min,
+        "x_max": x_max,
+    }
+
+
+def _first_level(x, y, chunk=BUILD_CHUNK):
+    """Level 1, built BUILD_CHUNK raw points at a time so x and y can be memmaps."""
+    parts = [_coarsen(_base_level(x[i:i + chunk], y[i:i + chunk]))
+             for i in range(0, len(x), chunk)]
+    return {field: np.concatenate([p[field] for p in parts]) for field in parts[0]}
+
+
+def build_levels(x, y):
+    """Return the list of coarse levels (level 1 upwards) for a series."""
+    levels = []
+    if len(x) <= MIN_BUCKETS:
+        return levels
+    level = _first_level(x, y)
+    while True:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            level["mean"] = level["sum"] / level["count"]
+        levels.append(level)
+        if len(level["x"]) <= MIN_BUCKETS:
+            return levels
+        level = _coarsen(level)
+
+
+# ---- Pyramid ----
+class SeriesPyramid:
+    def __init__(self, x, y, levels):
+        self.x = x
+        self.y = y
+        self.levels = levels
+
+    @classmethod
+    def build(cls, x, y):
+        return cls(x, y, build_levels(x, y))
+
+    def _span(self, xs, x_range):
+        if x_range is None:
+            return 0, len(xs)
+        x0, x1 = sorted(x_range)
+        start = max(np.searchsorted(xs, x0, side="right") - 1, 0)
+        stop = min(np.searchsorted(xs, x1, side="right") + 1, len(xs))
+        return start, stop
+
+    def query(self, x_range=None, max_points=MAX_POINTS, method="minmax"):
+        """
+        (x, y) for x_range with at most about max_points points.
+
+        Answered from the coarsest level giving at least max_points / 2
+        points. method="minmax" emits each bucket's min and max at their own
+        x positions, plus the first and last raw points of the range, so
+        spikes and the trace's ends survive; method="mean" emits one mean per
+        bucket.
+        """
+        start, stop = self._span(self.x, x_range)
+        if stop - start <= max_points:
+            return self.x[start:stop], self.y[start:stop]
+
+        per_bucket = 2 if method == "minmax" else 1
+        chosen = None
+        for level in reversed(self.levels):
+            lo, hi = self._span(level["x"], x_range)
+            if (hi - lo) * per_bucket >= max_points // 2 or level is self.levels[0]:
+                chosen = (level, lo, hi)
+                break
+        if chosen is None:
+            return minmax(self.x[start:stop], self.y[start:stop], max_points)
+
+        level, lo, hi = chosen
+        keep = np.nonzero(level["count"][lo:hi])[0] + lo
+        if method == "mean":
+            return level["x"][keep], level["mean"][keep]
+
+        ends = [start, stop - 1]
+        xs = np.concatenate([self.x[ends], level["x_min"][keep], level["x_max"][keep]])
+        ys = np.concatenate([self.y[ends], level["min"][keep], level["max"][keep]])
+        order = np.argsort(xs, kind="stable")
+        xs, ys = xs[order], ys[order]
+        repeat = np.zeros(len(xs), dtype=bool)
+        repeat[1:] = (xs[1:] == xs[:-1]) & ((ys[1:] == ys[:-1]) | np.isnan(ys[1:]))
+        xs, ys = xs[~repeat], ys[~repeat]
+        if len(xs) > max_points:
+            xs, ys = minmax(xs, ys, max_points)
+        return xs, ys
+
+
+# ---- Storage ----
+def _pyramid_dir(source_path, y_col):
+    safe = "".join(c if c.isalnum() else "_" for c in y_col)
+    return os.path.join(cache_path_for(source_path), "pyramid", safe)
+
+
+def save_levels(directory, levels, stamp):
+    tmp = staging_dir(directory)
+    for k, level in enumerate(levels, start=1):
+        for field in FIELDS:
+            np.save(os.path.join(tmp, f"L{k}-{field}.npy"), level[field], allow_pickle=False)
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({**stamp, "factor": FACTOR, "levels": len(levels)}, f)
+    swap_dir(tmp, directory)
+
+
+def load_levels(directory, stamp):
+    """Stored levels, or None when missing or built from an older source file."""
+    try:
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("factor") != FACTOR or any(meta.get(k) != v for k, v in stamp.items()):
+        return None
+    try:
+        return [
+            {
+                field: np.load(os.path.join(directory, f"L{k}-{field}.npy"), mmap_mode="r")
+                for field in FIELDS
+            }
+            for k in range(1, meta["levels"] + 1)
+        ]
+    except (OSError, ValueError):
+        return None
+
+
+def load_pyramid(source_path, x, y, y_col):
+    """Pyramid for column `y_col` of the CSV at source_path, cached on disk."""
+    directory = _pyramid_dir(source_path, y_col)
+    stamp = file_stamp(source_path)
+    levels = load_levels(directory, stamp)
+    if levels is None:
+        levels = build_levels(x, y)
+        try:
+            save_levels(directory, levels, stamp)
+        except OSError:
+            pass  # Read-only cache: keep the in-memory levels.
+    return SeriesPyramid(x, y, levels)
+
+
+def pyramid_frames(frames, y_label, x_range=None, max_points=MAX_POINTS,
+                   method="minmax", x_label="Time"):
+    """
+    Answer a figure request from pyramids.
+
+    `frames` is a registry.LazyFrames; returns {legend: DataFrame} holding
+    just the points to plot for x_range.
+    """
+    out = {}
+    for legend in frames:
+        handle = frames.handle(legend)
+        if y_label not in handle.columns:
+            out[legend] = frames[legend]
+            continue
+        x, y = handle.pyramid(y_label, x_label).query(x_range, max_points, method)
+        out[legend] = pd.DataFrame({x_label: x, y_label: y}, copy=False)
+    return out
@@ -0,0 +1,337 @@
+"""
+Dataset registry for the dashboards.
+
+Runs are discovered under the configured data roots (graph_data/,
+graph_datav1/, graph_datav2/ by default). Discovery only lists file names;
+a series is read from disk the first time a figure asks for its columns, and
+only those columns are read.
+
+A series is either a CSV (read through data_cache) or a memory-mapped
+*.series directory (see series_store); both expose the same handle API.
+Per-metric CSVs covered by an up-to-date wide table (see wide_table) are
+served from that table's columns instead.
+"""
+import os
+from collections.abc import Mapping
+
+import pandas as pd
+from data_cache import load_csv
+from pyramid import load_pyramid
+from series_store import HEADER_FILE, SUFFIX, SeriesRun, is_run, per_flow
+from wide_table import wide_views
+
+DEFAULT_ROOTS = ["./graph_data", "./graph_datav1", "./graph_datav2"]
+
+
+def configured_roots():
+    """Data roots from $GRAPH_DATA_ROOTS (os.pathsep separated), else the defaults."""
+    env = os.environ.get("GRAPH_DATA_ROOTS")
+    if env:
+        return [p for p in env.split(os.pathsep) if p]
+    return list(DEFAULT_ROOTS)
+
+
+# ---- Handles ----
+class SeriesHandle:
+    """One CSV in a run. Holds the path and whatever columns were loaded so far."""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self._available = None
+        self._loaded = {}
+        self._pyramids = {}
+        self.content_hash = None
+
+    def __repr__(self):
+        return f"SeriesHandle({self.path!r})"
+
+    @property
+    def columns(self):
+        if self._available is None:
+            self._available = list(pd.read_csv(self.path, nrows=0).columns)
+        return self._available
+
+    def load(self, columns=None):
+        """Return a DataFrame of `columns` (all if None); missing names are skipped."""
+        wanted = self.columns if columns is None else [c for c in columns if c in self.columns]
+        pending = [c for c in wanted if c not in self._loaded]
+        if pending:
+            df = load_csv(self.path, columns=pending)
+            if df.attrs.get("content_hash") != self.content_hash:
+                # The file changed since the last load; drop columns from the old version.
+                self._loaded.clear()
+                self._pyramids.clear()
+                self.content_hash = df.attrs.get("content_hash")
+            for c in pending:
+                self._loaded[c] = df[c].to_numpy()
+            pending = [c for c in wanted if c not in self._loaded]
+            if pending:
+                return self.load(columns)
+        out = pd.DataFrame({c: self._loaded[c] for c in wanted}, columns=wanted, copy=False)
+        out.attrs["content_hash"] = self.content_hash
+        return out
+
+    def pyramid(self, y_col, x_col="Time"):
+        """Multi-resolution pyramid of y_col over x_col, built or read from cache once."""
+        key = (x_col, y_col)
+        if key not in self._pyramids:
+            df = self.load([x_col, y_col])
+            self._pyramids[key] = load_pyramid(self.path, df[x_col].to_numpy(), df[y_col].to_numpy(), y_col)
+        return self._pyramids[key]
+
+    def unload(self):
+        self._loaded.clear()
+        self._pyramids.clear()
+        self.content_hash = None
+
+
+class SeriesRunHandle:
+    """A memory-mapped *.series run; columns are mapped, never read up front."""
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(os.path.normpath(path))[:-len(SUFFIX)]
+        self._run = None
+        self._pyramids = {}
+
+    def __repr__(self):
+        return f"SeriesRunHandle({self.path!r})"
+
+    @property
+    def run(self):
+        if self._run is None:
+            self._run = SeriesRun(self.path)
+        return self._run
+
+    @property
+    def columns(self):
+        return self.run.columns
+
+    @property
+    def content_hash(self):
+        return self.run.revision
+
+    def load(self, columns=None, x_range=None):
+        """DataFrame of memmap views; missing names are skipped."""
+        wanted = self.columns if columns is None else [c for c in columns if c in self.columns]
+        return self.run.frame(wanted, x_range)
+
+    def pyramid(self, y_col, x_col="Time"):
+        key = (x_col, y_col)
+        if key not in self._pyramids:
+            self._pyramids[key] = load_pyramid(
+                os.path.join(self.path, HEADER_FILE),
+                self.run.column(x_col), self.run.column(y_col), y_col,
+            )
+        return self._pyramids[key]
+
+    def unload(self):
+        self._run = None
+        self._pyramids.clear()
+
+
+class FlowHandle:
+    """One stream of a multi-stream run: column `flow` of its per_flow(y_col) data."""
+
+    def __init__(self, parent, y_col, flow, label=None, x_col="Time"):
+        self.parent = parent
+        self.path = parent.path
+        self.y_col = y_col
+        self.flow = flow
+        self.x_col = x_col
+        self.label = label if label is not None else flow
+        self.name = f"{parent.name} flow {self.label}"
+        self._pyramid = None
+
+    def __repr__(self):
+        return f"FlowHandle({self.parent.path!r}, {self.y_col!r}, {self.flow})"
+
+    @property
+    def columns(self):
+        return [self.x_col, self.y_col]
+
+    @property
+    def content_hash(self):
+        return self.parent.content_hash
+
+    def _values(self):
+        run = self.parent.run
+        return run.column(self.x_col), run.column(per_flow(self.y_col))[:, self.flow]
+
+    def load(self, columns=None, x_range=None):
+        start, stop = self.parent.run.span(x_range, self.x_col)
+        x, y = self._values()
+        df = pd.DataFrame({self.x_col: x[start:stop], self.y_col: y[start:stop]}, copy=False)
+        df.attrs["content_hash"] = self.content_hash
+        return df
+
+    def pyramid(self, y_col, x_col="Time"):
+        if self._pyramid is None:
+            x, y = self._values()
+            self._pyramid = load_pyramid(
+                os.path.join(self.path, HEADER_FILE),
+                x, y, f"{per_flow(self.y_col)} {self.flow}",
+            )
+        return self._pyramid
+
+    def unload(self):
+        self._pyramid = None
+
+
+class ViewHandle:
+    """A per-metric series served as a selection of a wide run's columns (see wide_table)."""
+
+    def __init__(self, parent, name, columns):
+        self.parent = parent
+        self.path = parent.path
+        self.name = name
+        self.columns = [c for c in columns if c in parent.columns]
+
+    def __repr__(self):
+        return f"ViewHandle({self.parent.path!r}, {self.name!r})"
+
+    @property
+    def content_hash(self):
+        return self.parent.content_hash
+
+    def load(self, columns=None, x_range=None):
+        wanted = self.columns if columns is None else [c for c in columns if c in self.columns]
+        return self.parent.load(wanted, x_range)
+
+    def pyramid(self, y_col, x_col="Time"):
+        return self.parent.pyramid(y_col, x_col)
+
+    def unload(self):
+        self.parent.unload()
+
+
+def flow_handles(handle, y_col, x_col="Time"):
+    """Per-stream handles of a run with per_flow(y_col) data, else []."""
+    if not isinstance(handle, SeriesRunHandle) or per_flow(y_col) not in handle.columns:
+        return []
+    n = handle.run.header["columns"][per_flow(y_col)]["shape"][1]
+    attrs = handle.run.attrs
+    labels = attrs.get("flows") or attrs.get("sockets") or list(range(n))
+    if len(labels) != n:
+        labels = list(range(n))
+    return [FlowHandle(handle, y_col, i, labels[i], x_col) for i in range(n)]
+
+
+def open_series(path):
+    """Handle for a CSV file or a *.series run directory."""
+    if path.endswith(SUFFIX) and is_run(path):
+        return SeriesRunHandle(path)
+    return SeriesHandle(path)
+
+
+class LazyFrames(Mapping):
+    """Legend name -> DataFrame mapping that loads each series on first access."""
+
+    def __init__(self, handles, columns=None):
+        self._handles = dict(handles)
+        self._columns = columns
+        self._frames = {}
+
+    def __getitem__(self, legend):
+        if legend not in self._frames:
+            self._frames[legend] = self._handles[legend].load(self._columns)
+        return self._frames[legend]
+
+    def __iter__(self):
+        return iter(self._handles)
+
+    def handle(self, legend):
+        return self._handles[legend]
+
+    def __len__(self):
+        return len(self._handles)
+
+    def per_flow(self, y_col, x_col="Time"):
+        """
+        The same frames with every multi-stream run split into one legend per
+        flow ("<legend> flow <socket>"); other series are kept as they are.
+        """
+        handles = {}
+        for legend, handle in self._handles.items():
+            flows = flow_handles(handle, y_col, x_col)
+            if not flows:
+                handles[legend] = handle
+            for flow in flows:
+                handles[f"{legend} flow {flow.label}"] = flow
+        return LazyFrames(handles, self._columns)
+
+
+class Run:
+    """A directory of series CSVs and/or *.series runs, e.g. graph_data/."""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.series = {}
+        for file_name in sorted(os.listdir(path)):
+            if _is_series(os.path.join(path, file_name)):
+                handle = open_series(os.path.join(path, file_name))
+                self.series[handle.name] = handle
+        # A current wide table (see wide_table) serves the per-metric CSVs it replaces.
+        for handle in list(self.series.values()):
+            if isinstance(handle, SeriesRunHandle):
+                for name, columns in wide_views(handle.path).items():
+                    self.series[name] = ViewHandle(handle, name, columns)
+
+    def __repr__(self):
+        return f"Run({self.name!r}, {len(self.series)} series)"
+
+    def frames(self, sources, columns=None):
+        """
+        Map legend names to lazily loaded frames.
+
+        `sources` is {legend: series name}, e.g. {"CUBIC": "cubic_rtt"}.
+        """
+        missing = [s for s in sources.values() if s not in self.series]
+        if missing:
+            raise KeyError(f"{missing} not found in run {self.name!r}")
+        return LazyFrames({legend: self.series[s] for legend, s in sources.items()}, columns)
+
+
+def _is_series(path):
+    if path.endswith(".csv"):
+        return os.path.isfile(path)
+    return path.endswith(SUFFIX) and is_run(path)
+
+
+# ---- Registry ----
+class DatasetRegistry:
+    def __init__(self, roots=None):
+        self.roots = list(roots) if roots is not None else configured_roots()
+        self._runs = None
+
+    def discover(self):
+        """(Re)scan the roots. A root holding series is a run; so is each such subdirectory."""
+        runs = {}
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            base = os.path.basename(os.path.normpath(root))
+            candidates = [(base, root)] + [
+                (f"{base}/{d}", os.path.join(root, d))
+                for d in sorted(os.listdir(root))
+                if os.path.isdir(os.path.join(root, d)) and not d.endswith(SUFFIX)
+            ]
+            for name, path in candidates:
+                if any(_is_series(os.path.join(path, f)) for f in os.listdir(path)):
+                    runs[name] = Run(name, path)
+        self._runs = runs
+        return runs
+
+    @property
+    def runs(self):
+        if self._runs is None:
+            self.discover()
+        return self._runs
+
+    def run(self, name):
+        try:
+            return self.runs[name]
+        except KeyError:
+            raise KeyError(f"Unknown run {name!r}; known runs: {sorted(self.runs)}") from None
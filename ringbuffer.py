@@ -0,0 +1,134 @@
+"""
+Bounded ring buffers for live telemetry.
+
+RingBuffer preallocates NumPy storage for `capacity` rows of a fixed set of
+columns (e.g. Time, SmoothedRTT). Appends are O(1) per row and never
+reallocate. Every row is written twice, at i and i + capacity, so the most
+recent n <= capacity rows are always one contiguous slice and windows are
+returned as zero-copy views.
+
+Views alias the buffer: they stay valid until `capacity - n` more rows have
+been appended. Copy them (np.array / .tolist()) to keep them longer.
+
+TelemetryStore holds one RingBuffer per (run, variant, metric) with columns
+("Time", metric), matching the frames mainv9 plots.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CAPACITY = 3600
+
+
+class RingBuffer:
+    def __init__(self, capacity=DEFAULT_CAPACITY, columns=("Time", "Value"), dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self._data = {name: np.zeros(2 * capacity, dtype=dtype) for name in self.columns}
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def __repr__(self):
+        return f"RingBuffer({list(self.columns)}, {len(self)}/{self.capacity})"
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    # ---- Writing ----
+    def append(self, *values):
+        """Append one row, given in column order."""
+        with self._lock:
+            i = self.total % self.capacity
+            for name, value in zip(self.columns, values):
+                col = self._data[name]
+                col[i] = value
+                col[i + self.capacity] = value
+            self.total += 1
+
+    def extend(self, rows):
+        """Append many rows at once; `rows` is {column: equal-length array}."""
+        arrays = [np.asarray(rows[name]) for name in self.columns]
+        n = len(arrays[0])
+        if n == 0:
+            return
+        with self._lock:
+            skip = max(n - self.capacity, 0)  # rows that would be overwritten anyway
+            idx = (self.total + skip + np.arange(n - skip)) % self.capacity
+            for name, values in zip(self.columns, arrays):
+                col = self._data[name]
+                col[idx] = values[skip:]
+                col[idx + self.capacity] = values[skip:]
+            self.total += n
+
+    # ---- Reading ----
+    def _tail(self, n):
+        end = self.total % self.capacity + self.capacity
+        return {name: col[end - n:end] for name, col in self._data.items()}
+
+    def last(self, n=None):
+        """Views of the most recent n rows (all held rows if None)."""
+        with self._lock:
+            held = len(self)
+            return self._tail(held if n is None else min(n, held))
+
+    def after(self, t, time_col="Time", copy=False):
+        """
+        Held rows whose time is later than `t` (all of them if t is None).
+
+        Rows are views unless copy=True, which copies them under the lock so
+        concurrent appends can't overwrite them mid-read.
+        """
+        with self._lock:
+            rows = self._tail(len(self))
+            if t is not None:
+                start = np.searchsorted(rows[time_col], t, side="right")
+                rows = {name: values[start:] for name, values in rows.items()}
+            if copy:
+                rows = {name: values.copy() for name, values in rows.items()}
+            return rows
+
+    def window(self, seconds, time_col="Time"):
+        """Views of the rows within `seconds` of the newest row's time."""
+        with self._lock:
+            rows = self._tail(len(self))
+            t = rows[time_col]
+            if not len(t):
+                return rows
+            start = np.searchsorted(t, t[-1] - seconds, side="left")
+            return {name: values[start:] for name, values in rows.items()}
+
+    def frame(self, seconds=None):
+        """DataFrame over the held rows (or the last `seconds`), without copying."""
+        rows = self.last() if seconds is None else self.window(seconds)
+        return pd.DataFrame(rows, columns=list(self.columns), copy=False)
+
+
+class TelemetryStore:
+    """RingBuffers keyed by (run, variant, metric), created on first use."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def buffer(self, run, variant, metric):
+        key = (run, variant, metric)
+        with self._lock:
+            if key not in self._buffers:
+                self._buffers[key] = RingBuffer(self.capacity, columns=("Time", metric))
+            return self._buffers[key]
+
+    def append(self, run, variant, metric, t, value):
+        """Append one point, or arrays of points."""
+        buf = self.buffer(run, variant, metric)
+        if np.ndim(t) == 0:
+            buf.append(t, value)
+        else:
+            buf.extend({"Time": t, metric: value})
+
+    def frames(self, run, variants, metric, seconds=None):
+        """{variant: DataFrame(Time, metric)} for line_figure."""
+        return {v: self.buffer(run, v, metric).frame(seconds) for v in variants}
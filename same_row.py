@@ -3,6 +3,8 @@ from dash import dcc, html, Input, Output
 import plotly.express as px
 import pandas as pd
 import numpy as np
+from data_cache import load_csv
+from figure_cache import memoize_figure
 
 # ---- Step 1: Assume the following DataFrames are already defined ----
 # Each DataFrame contains "Time" and either "SmoothedRTT" or "Throughput (Mbit/s)"
@@ -10,17 +12,17 @@ import numpy as np
 # Example dummy DataFrames (replace with your real ones)
 # Replace these with: tfcubic, utf, baseline_propagation_delay_df, baseline_Throuhgput_df
 
-utf_rtt = pd.read_csv('./graph_data/udp_prague_rtt.csv')
-tfcubic_rtt = pd.read_csv('./graph_data/cubic_rtt.csv')
-baseline_propagation_delay_df = pd.read_csv('./graph_data/baseline_propagation_delay_df.csv')
+utf_rtt = load_csv('./graph_data/udp_prague_rtt.csv')
+tfcubic_rtt = load_csv('./graph_data/cubic_rtt.csv')
+baseline_propagation_delay_df = load_csv('./graph_data/baseline_propagation_delay_df.csv')
 
-baseline_throuhgput_df = pd.read_csv('./graph_data/baseline_throughput.csv')
-tfcubic_thrpt = pd.read_csv('./graph_data/cubic_thrpt.csv')
-utf_thrpt = pd.read_csv('./graph_data/udp_prague_thrpt.csv')
+baseline_throuhgput_df = load_csv('./graph_data/baseline_throughput.csv')
+tfcubic_thrpt = load_csv('./graph_data/cubic_thrpt.csv')
+utf_thrpt = load_csv('./graph_data/udp_prague_thrpt.csv')
 
 
-tfcubic_loss = pd.read_csv('./graph_data/cubic_loss.csv')
-utf_loss = pd.read_csv('./graph_data/udp_prague_loss.csv')
+tfcubic_loss = load_csv('./graph_data/cubic_loss.csv')
+utf_loss = load_csv('./graph_data/udp_prague_loss.csv')
 
 
 loss_paths = {
@@ -43,6 +45,7 @@ thrpt_paths = {
 
 # ---- Step 3: Dash App ----
 app = dash.Dash(__name__)
+server = app.server  # WSGI entry point, see serve.py
 app.title = "RTT and Throughput Comparison"
 
 app.layout = html.Div([
@@ -81,6 +84,7 @@ app.layout = html.Div([
     Output("comparison-graph", "figure"),
     Input("metric-type", "value")
 )
+@memoize_figure(lambda: [rtt_paths, thrpt_paths])
 def update_comparison_graph(metric_type):
     if metric_type == "RTT":
         data_dict = rtt_paths
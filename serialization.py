@@ -0,0 +1,101 @@
+"""
+Faster JSON responses for Dash.
+
+enable_fast_json() (opt-in) switches plotly's JSON engine, which Dash uses for
+both the layout and callback responses, to orjson when it is installed.
+orjson encodes NumPy arrays natively instead of going through Python lists.
+
+LayoutCache serves /_dash-layout from bytes encoded (and compressed) once,
+rather than re-encoding the whole static layout, figures included, on every
+page load. It also sets an ETag derived from the dataset content hash, so
+reloads with an unchanged dataset get a 304.
+"""
+import hashlib
+import importlib.util
+
+import flask
+import plotly.io as pio
+from compression import choose_encoding, compress
+
+
+def enable_fast_json():
+    """Use orjson for plotly/Dash JSON encoding. Returns False if orjson is missing."""
+    if importlib.util.find_spec("orjson") is None:
+        return False
+    pio.json.config.default_engine = "orjson"
+    return True
+
+
+class LayoutCache:
+    """
+    Pre-serialized copy of a static app.layout, resolved through
+    app.get_layout() like Dash's own handler, so extra components and layout
+    hooks are included.
+
+    Encoded on the first /_dash-layout request. `version` is an optional
+    callable returning the dataset version (see figure_cache.dataset_version)
+    that goes into the ETag. Call invalidate() after replacing app.layout or
+    reloading data. Dynamic layouts (app.layout = function) bypass the cache.
+    """
+
+    def __init__(self, app, version=None):
+        self.app = app
+        self.version = version
+        self.path = app.config.routes_pathname_prefix + "_dash-layout"
+        self._body = None
+        self._etag = None
+        self._encoded = {}
+        app.server.before_request(self._serve)
+
+    @property
+    def body(self):
+        if self._body is None:
+            self._body = pio.json.to_json_plotly(self.app.get_layout()).encode("utf-8")
+        return self._body
+
+    @property
+    def etag(self):
+        if self._etag is None:
+            h = hashlib.sha1(self.body)
+            if self.version is not None:
+                h.update(self.version().encode("utf-8"))
+            self._etag = h.hexdigest()[:24]
+        return self._etag
+
+    def encoded(self, encoding):
+        if encoding is None:
+            return self.body
+        if encoding not in self._encoded:
+            self._encoded[encoding] = compress(self.body, encoding)
+        return self._encoded[encoding]
+
+    def prime(self, accept_encoding="gzip, deflate, br"):
+        """
+        Encode the body, its ETag and the copy compressed for a typical
+        browser now rather than on the first request; returns the ETag.
+        """
+        self.encoded(choose_encoding(accept_encoding))
+        return self.etag
+
+    def invalidate(self):
+        self._body = None
+        self._etag = None
+        self._encoded = {}
+
+    def _serve(self):
+        if flask.request.path != self.path or callable(self.app.layout):
+            return None
+
+        etag = self.etag
+        if etag in flask.request.if_none_match:
+            response = flask.Response(status=304)
+        else:
+            encoding = choose_encoding(flask.request.headers.get("Accept-Encoding"))
+            response = flask.Response(self.encoded(encoding), mimetype="application/json")
+            if encoding is not None:
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        response.vary.add("Accept-Encoding")
+        # Let browsers keep the layout but revalidate it on every load.
+        response.cache_control.no_cache = True
+        return response
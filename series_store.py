@@ -0,0 +1,226 @@
+"""
+Memory-mapped per-run series files for out-of-core runs.
+
+A run is stored as a directory, e.g. graph_data/cubic_week.series/, holding
+one raw fixed-dtype file per column plus a small header.json:
+
+    {
+      "format": "series/1",
+      "length": 604800,
+      "index": "Time",
+      "revision": "<hex>",
+      "columns": {"Time": {"file": "0.bin", "dtype": "<f8", "shape": [604800]}, ...},
+      "attrs": {...}
+    }
+
+Columns are opened with np.memmap, so opening a run only reads the header,
+and slicing by time binary-searches the index column and touches just the
+pages it returns. Columns may be 2-D (rows x streams); by convention the
+per-stream data behind an aggregate column "X" is stored as "X per flow".
+"""
+import json
+import os
+import sys
+import uuid
+
+import numpy as np
+import pandas as pd
+
+HEADER_FILE = "header.json"
+FORMAT = "series/1"
+SUFFIX = ".series"
+FLOW_SUFFIX = " per flow"
+
+
+def per_flow(column):
+    """Name of the (rows x streams) column behind aggregate column `column`."""
+    return column + FLOW_SUFFIX
+
+
+# ---- Writing ----
+def _write_header(path, header):
+    tmp = os.path.join(path, f"{HEADER_FILE}.tmp-{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump(header, f, indent=1)
+    os.replace(tmp, os.path.join(path, HEADER_FILE))
+
+
+def write_run(path, columns, index="Time", attrs=None):
+    """
+    Write `columns` ({name: array-like}, equal length) as a run at `path`.
+
+    Existing column files in `path` are replaced.
+    """
+    os.makedirs(path, exist_ok=True)
+    arrays = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+    lengths = {len(a) for a in arrays.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+    if index is not None and index not in arrays:
+        raise KeyError(f"Index column {index!r} not in columns")
+
+    spec = {}
+    for i, (name, values) in enumerate(arrays.items()):
+        if values.dtype == object:
+            raise TypeError(f"Column {name!r} has object dtype; series files need fixed dtypes")
+        values = values.astype(values.dtype.newbyteorder("<"), copy=False)
+        file_name = f"{i}.bin"
+        # Write aside and swap in: truncating a file another process has
+        # memory-mapped would crash that process on its next read.
+        tmp = os.path.join(path, f"{file_name}.tmp-{os.getpid()}")
+        values.tofile(tmp)
+        os.replace(tmp, os.path.join(path, file_name))
+        spec[name] = {"file": file_name, "dtype": values.dtype.str, "shape": list(values.shape)}
+
+    header = {
+        "format": FORMAT,
+        "length": lengths.pop() if lengths else 0,
+        "index": index,
+        "revision": uuid.uuid4().hex,
+        "columns": spec,
+        "attrs": attrs or {},
+    }
+    _write_header(path, header)
+    return header
+
+
+def write_frame(path, df, index="Time", attrs=None):
+    """write_run for a DataFrame; text columns are skipped."""
+    columns = {
+        name: df[name].to_numpy()
+        for name in df.columns
+        if df[name].dtype.kind in "biuf"
+    }
+    return write_run(path, columns, index=index, attrs=attrs)
+
+
+def append_run(path, columns):
+    """
+    Append rows to an existing run. `columns` must cover every column.
+
+    Data files are appended first and the header is swapped in last, so
+    readers never see a length longer than the data on disk. Each file is
+    first cut back to the header's length, dropping rows left behind by an
+    append that died before its header was written.
+    """
+    header = read_header(path)
+    missing = set(header["columns"]) ^ set(columns)
+    if missing:
+        raise KeyError(f"append_run needs exactly the run's columns; mismatch: {sorted(missing)}")
+
+    arrays = {}
+    for name, spec in header["columns"].items():
+        values = np.ascontiguousarray(columns[name], dtype=np.dtype(spec["dtype"]))
+        if list(values.shape[1:]) != spec["shape"][1:]:
+            raise ValueError(f"Column {name!r} has shape {values.shape}, run has {spec['shape']}")
+        arrays[name] = values
+    added = {len(a) for a in arrays.values()}
+    if len(added) > 1:
+        raise ValueError(f"Columns have different lengths: {sorted(added)}")
+    added = added.pop() if added else 0
+
+    for name, values in arrays.items():
+        spec = header["columns"][name]
+        row_bytes = np.dtype(spec["dtype"]).itemsize * int(np.prod(spec["shape"][1:]))
+        with open(os.path.join(path, spec["file"]), "r+b") as f:
+            f.truncate(spec["shape"][0] * row_bytes)
+            f.seek(0, os.SEEK_END)
+            values.tofile(f)
+        spec["shape"][0] += added
+    header["length"] += added
+    header["revision"] = uuid.uuid4().hex
+    _write_header(path, header)
+    return header
+
+
+# ---- Reading ----
+def read_header(path):
+    with open(os.path.join(path, HEADER_FILE), "r") as f:
+        header = json.load(f)
+    if header.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a {FORMAT} run")
+    return header
+
+
+def is_run(path):
+    return os.path.isfile(os.path.join(path, HEADER_FILE))
+
+
+class SeriesRun:
+    """Read-only view of a run directory; columns are memory-mapped on first use."""
+
+    def __init__(self, path):
+        self.path = path
+        self.header = read_header(path)
+        self._maps = {}
+
+    def __repr__(self):
+        return f"SeriesRun({self.path!r}, {len(self)} rows)"
+
+    def __len__(self):
+        return self.header["length"]
+
+    @property
+    def columns(self):
+        return list(self.header["columns"])
+
+    @property
+    def index(self):
+        return self.header["index"]
+
+    @property
+    def revision(self):
+        return self.header["revision"]
+
+    @property
+    def attrs(self):
+        return self.header["attrs"]
+
+    def column(self, name):
+        if name not in self._maps:
+            spec = self.header["columns"][name]
+            shape = tuple(spec["shape"])
+            if shape[0] == 0:
+                self._maps[name] = np.empty(shape, dtype=spec["dtype"])
+            else:
+                self._maps[name] = np.memmap(
+                    os.path.join(self.path, spec["file"]),
+                    dtype=spec["dtype"], mode="r", shape=shape,
+                )
+        return self._maps[name]
+
+    def span(self, x_range, x_col=None):
+        """Row bounds [start, stop) of x_range on the (sorted) index column."""
+        if x_range is None:
+            return 0, len(self)
+        x = self.column(x_col or self.index)
+        x0, x1 = sorted(x_range)
+        return int(np.searchsorted(x, x0, side="left")), int(np.searchsorted(x, x1, side="right"))
+
+    def slice(self, columns=None, x_range=None):
+        """{name: memmap view} for the rows inside x_range."""
+        start, stop = self.span(x_range)
+        names = self.columns if columns is None else columns
+        return {name: self.column(name)[start:stop] for name in names}
+
+    def frame(self, columns=None, x_range=None):
+        """DataFrame over slice(); 1-D columns only, no copies."""
+        data = {
+            name: values
+            for name, values in self.slice(columns, x_range).items()
+            if values.ndim == 1
+        }
+        df = pd.DataFrame(data, columns=list(data), copy=False)
+        df.attrs["content_hash"] = self.revision
+        return df
+
+
+# ---- CLI ----
+if __name__ == "__main__":
+    # python series_store.py graph_data/cubic_rtt.csv [out.series]
+    from data_cache import load_csv
+
+    src = sys.argv[1]
+    dst = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + SUFFIX
+    header = write_frame(dst, load_csv(src))
+    print(f"{src} -> {dst} ({header['length']} rows, {len(header['columns'])} columns)")
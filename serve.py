@@ -0,0 +1,81 @@
+"""
+Production entry point for the dashboards.
+
+    python serve.py mainv9 --workers 4 --bind 0.0.0.0:8050
+
+Runs the Dash module's Flask server (`module.server`) under gunicorn with
+preload_app: the module is imported once in the master, so datasets,
+pyramids and figures are built before forking and shared copy-on-write by
+every worker. Cached columns are memory-mapped .npy files (see data_cache),
+so they live once in the page cache however many workers there are. Dev
+tools (hot reload, error overlay, callback graph) stay off unless --debug
+is given.
+
+Requires gunicorn (pip install gunicorn); it runs on Linux/macOS only.
+"""
+import argparse
+import gc
+import importlib
+import multiprocessing
+import os
+import sys
+
+
+def load_dash_app(module_name):
+    module = importlib.import_module(module_name)
+    return module, module.app
+
+
+def warm(module):
+    """Build whatever the module would otherwise build lazily on the first request."""
+    layout_cache = getattr(module, "layout_cache", None)
+    if layout_cache is not None:
+        layout_cache.prime()
+    # Objects created so far are never freed; keep the collector from writing
+    # to their pages in the workers, which would defeat copy-on-write sharing.
+    gc.freeze()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", nargs="?", default="mainv9",
+                        help="dashboard module exposing `app` (default: mainv9)")
+    parser.add_argument("--bind", default=os.environ.get("DASH_BIND", "0.0.0.0:8050"))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("DASH_WORKERS", multiprocessing.cpu_count())))
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("DASH_THREADS", 4)),
+                        help="threads per worker")
+    parser.add_argument("--timeout", type=int, default=60)
+    parser.add_argument("--debug", action="store_true",
+                        help="enable Dash dev tools (slow; development only)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("serve.py needs gunicorn: pip install gunicorn")
+
+    module, app = load_dash_app(args.module)
+    if args.debug:
+        app.enable_dev_tools(debug=True)
+    warm(module)
+
+    class DashApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", args.bind)
+            self.cfg.set("workers", args.workers)
+            self.cfg.set("threads", args.threads)
+            self.cfg.set("timeout", args.timeout)
+            self.cfg.set("preload_app", True)
+
+        def load(self):
+            return app.server
+
+    DashApplication().run()
+
+
+if __name__ == "__main__":
+    main()
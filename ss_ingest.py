@@ -0,0 +1,206 @@
+"""
+Streaming parser for `ss -tin` sampling logs.
+
+Assumed input: a sampler loop that prints an epoch timestamp line before
+each snapshot, e.g.
+
+    while sleep 0.01; do date +%s.%N; ss -tin dst 10.0.0.2; done >> ss.log
+
+which gives blocks like
+
+    1749182714.120034512
+    State  Recv-Q Send-Q Local Address:Port  Peer Address:Port
+    ESTAB  0      0      10.0.0.1:40000      10.0.0.2:5201
+             cubic wscale:7,7 rto:204 rtt:12.18/3.2 mss:1448 cwnd:167 ...
+             pacing_rate 190.3Mbps delivery_rate 155.2Mbps ... retrans:0/12
+
+(a "# " before the timestamp is also accepted). Text is parsed a chunk at a
+time: each compiled field regex runs over the whole chunk, and its matches
+are assigned to socket rows with np.searchsorted on the row offsets. Lines
+are never split or looped over; the per-sample Python work left is reading
+the offset and value of each match.
+
+Columns: Time (s since the first sample), SmoothedRTT, rttvar (ms), cwnd
+(segments), snd_cwnd_kb, pacing_rate, delivery_rate (Mbit/s) and retrans
+(total retransmitted segments). Missing fields are NaN.
+
+    python ss_ingest.py ss.log [out.series] [--flow 10.0.0.2:5201]
+"""
+import argparse
+import os
+import re
+
+import numpy as np
+from series_store import SUFFIX, write_run
+from tail_reader import READ_CHUNK, TailReader, line_chunks
+
+TIMESTAMP_RE = re.compile(rb"^(?:#[ \t]*)?(\d+(?:\.\d+)?)[ \t]*\r?$", re.M)
+ROW_RE = re.compile(rb"^[A-Z][A-Z0-9-]*[ \t]+\d+[ \t]+\d+[ \t]+(\S+)[ \t]+(\S+)[^\n]*\n[ \t]+[^\n]*", re.M)
+ROW_HEAD_RE = re.compile(rb"[A-Z][A-Z0-9-]*[ \t]+\d+[ \t]+\d+[ \t]+\S+[ \t]+\S+[^\n]*\n")
+RATE_UNITS = {b"": 1e-6, b"K": 1e-3, b"M": 1.0, b"G": 1e3}  # -> Mbit/s
+
+# Fields are space-separated; the leading space (rather than \b) keeps
+# "minrtt:"/"rcv_rtt:" out and lets re skip ahead on the literal prefix.
+RTT_RE = re.compile(rb" rtt:([\d.]+)/([\d.]+)")
+# column -> (regex, value group); rate regexes also capture a unit prefix.
+FIELDS = {
+    "SmoothedRTT": (RTT_RE, 1),
+    "rttvar": (RTT_RE, 2),
+    "cwnd": (re.compile(rb" cwnd:(\d+)"), 1),
+    "mss": (re.compile(rb" mss:(\d+)"), 1),
+    "retrans": (re.compile(rb" retrans:\d+/(\d+)"), 1),
+}
+RATES = {
+    "pacing_rate": re.compile(rb" pacing_rate ([\d.]+)([KMG]?)bps"),
+    "delivery_rate": re.compile(rb" delivery_rate ([\d.]+)([KMG]?)bps"),
+}
+COLUMNS = ("Time", "SmoothedRTT", "rttvar", "cwnd", "snd_cwnd_kb", "pacing_rate", "delivery_rate", "retrans")
+
+
+def _to_float(values):
+    return np.array(values, dtype=bytes).astype(np.float64) if values else np.zeros(0)
+
+
+def _column(matches, starts, stops, group, rate=False):
+    """One value per socket row from regex `matches` (NaN where none)."""
+    out = np.full(len(starts), np.nan)
+    if not matches or not len(starts):
+        return out
+    pos = np.array([m.start() for m in matches], dtype=np.int64)
+    row = np.searchsorted(starts, pos, side="right") - 1
+    inside = (row >= 0) & (pos < stops[np.maximum(row, 0)])
+    kept = [m for m, keep in zip(matches, inside) if keep]
+    values = _to_float([m.group(group) for m in kept])
+    if rate:
+        values *= np.array([RATE_UNITS[m.group(2)] for m in kept])
+    out[row[inside]] = values
+    return out
+
+
+class SsParser:
+    """
+    Incremental parser: feed() it complete lines, get new samples back.
+
+    Every socket row is returned, with a "flow" column indexing `flows`
+    ("local peer" labels in order of first appearance).
+    """
+
+    def __init__(self):
+        self.flows = []
+        self._flow_ids = {}
+        self._carry = b""
+        self.last_time = np.nan
+        self.t0 = None
+
+    def _flow_id(self, local, peer):
+        key = (local, peer)
+        if key not in self._flow_ids:
+            self._flow_ids[key] = len(self.flows)
+            self.flows.append(f"{local.decode()} {peer.decode()}")
+        return self._flow_ids[key]
+
+    def feed(self, data):
+        """{column: array} for the socket rows completed by `data`."""
+        text = self._carry + data
+        self._carry = b""
+        rows = list(ROW_RE.finditer(text))
+        starts = np.array([m.start() for m in rows], dtype=np.int64)
+        stops = np.array([m.end() for m in rows], dtype=np.int64)
+
+        # A socket line at the very end is still waiting for its info line.
+        tail_from = int(stops[-1]) if len(rows) else 0
+        last_line = max(text.rfind(b"\n", tail_from, len(text) - 1) + 1, tail_from)
+        if ROW_HEAD_RE.fullmatch(text, last_line):
+            self._carry = text[last_line:]
+
+        stamps = list(TIMESTAMP_RE.finditer(text))
+        stamp_pos = np.array([m.start() for m in stamps], dtype=np.int64)
+        stamp_val = np.concatenate(([self.last_time], _to_float([m.group(1) for m in stamps])))
+        if stamps:
+            self.last_time = stamp_val[-1]
+            if self.t0 is None:
+                self.t0 = stamp_val[1]
+        times = stamp_val[np.searchsorted(stamp_pos, starts, side="right")]
+
+        out = {
+            "Time": times - (self.t0 if self.t0 is not None else 0.0),
+            "flow": np.array([self._flow_id(m.group(1), m.group(2)) for m in rows], dtype=np.int32),
+        }
+        found = {}
+        for name, (regex, group) in FIELDS.items():
+            if regex not in found:
+                found[regex] = list(regex.finditer(text))
+            out[name] = _column(found[regex], starts, stops, group)
+        for name, regex in RATES.items():
+            out[name] = _column(list(regex.finditer(text)), starts, stops, 1, rate=True)
+        out["snd_cwnd_kb"] = out["cwnd"] * out.pop("mss") / 1024.0
+        return out
+
+
+def parse_ss(path, chunk_size=READ_CHUNK):
+    """Parse a whole log; returns ({column: array}, flow labels)."""
+    parser = SsParser()
+    parts = [parser.feed(chunk) for chunk in line_chunks(path, chunk_size)]
+    names = list(parts[0]) if parts else list(COLUMNS) + ["flow"]
+    columns = {name: np.concatenate([p[name] for p in parts]) if parts else np.zeros(0) for name in names}
+    return columns, parser.flows
+
+
+def select_flow(columns, flows, flow=None):
+    """Rows of one socket: the first whose label contains `flow`, else the busiest."""
+    if not len(columns["flow"]):
+        return {name: columns[name] for name in COLUMNS}, None
+    if flow is None:
+        index = int(np.bincount(columns["flow"]).argmax())
+    else:
+        index = next((i for i, label in enumerate(flows) if flow in label), None)
+        if index is None:
+            raise ValueError(f"No socket matches {flow!r}; flows: {', '.join(flows)}")
+    keep = columns["flow"] == index
+    return {name: columns[name][keep] for name in COLUMNS}, flows[index]
+
+
+def ingest_ss(path, out_path=None, flow=None):
+    """Convert an ss log to a series run of one socket; returns the run header."""
+    columns, flows = parse_ss(path)
+    columns, label = select_flow(columns, flows, flow)
+    out_path = out_path or os.path.splitext(path)[0] + SUFFIX
+    return write_run(out_path, columns, index="Time", attrs={
+        "source": os.path.abspath(path), "flow": label, "flows": flows,
+    })
+
+
+class SsTailReader(TailReader):
+    """
+    Tails a growing ss log; read() returns new samples of one socket
+    (`flow`, or the first socket seen when None).
+    """
+
+    def __init__(self, path, flow=None):
+        super().__init__(path)
+        self.flow = flow
+        self.parser = SsParser()
+
+    def _reset(self):
+        super()._reset()
+        self.parser = SsParser()
+
+    def read(self, max_bytes=READ_CHUNK):
+        rows = self.parser.feed(self.read_lines(max_bytes))
+        if not self.parser.flows:
+            return {name: np.zeros(0) for name in COLUMNS}
+        if self.flow is None:
+            self.flow = self.parser.flows[0]
+        index = next((i for i, label in enumerate(self.parser.flows) if self.flow in label), -1)
+        keep = rows["flow"] == index
+        return {name: rows[name][keep] for name in COLUMNS}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log")
+    parser.add_argument("out", nargs="?")
+    parser.add_argument("--flow", help="substring of 'local peer' selecting the socket (default: busiest)")
+    args = parser.parse_args()
+    header = ingest_ss(args.log, args.out, args.flow)
+    print(f"{args.log}: {header['length']} samples of {header['attrs']['flow']}")
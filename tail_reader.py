@@ -0,0 +1,119 @@
+"""
+Incremental readers for files that grow while a test is running.
+
+TailReader remembers its byte offset in a file and, on each read, returns
+only the complete lines appended since the last read; a trailing partial line
+is left for the next call. If the file shrinks (truncated) or is replaced
+(rotated: new inode), reading restarts from the beginning and `rotated` is
+set, so refresh cost depends on new data, not on the file size.
+
+CsvTailReader parses those lines into typed column arrays. line_chunks()
+reads a finished file in the same complete-line chunks.
+"""
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+READ_CHUNK = 1 << 22
+
+
+def line_chunks(path, chunk_size=READ_CHUNK):
+    """Yield a file's bytes in chunks of complete lines; a last line without "\n" gets one."""
+    with open(path, "rb") as f:
+        carry = b""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            chunk = carry + chunk
+            cut = chunk.rfind(b"\n") + 1
+            carry = chunk[cut:]
+            if cut:
+                yield chunk[:cut]
+        if carry:
+            yield carry + b"\n"
+
+
+class TailReader:
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.rotated = False
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.path!r}, offset={self.offset})"
+
+    def _reset(self):
+        self.offset = 0
+        self.rotated = True
+
+    def _check_file(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset):
+            self._reset()
+        self.inode = st.st_ino
+        return st.st_size
+
+    def read_lines(self, max_bytes=None):
+        """Bytes of the complete lines appended since the last call (b"" if none)."""
+        self.rotated = False
+        size = self._check_file()
+        if size is None or size <= self.offset:
+            return b""
+
+        want = size - self.offset
+        if max_bytes is not None:
+            want = min(want, max_bytes)
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(want)
+
+        end = data.rfind(b"\n")
+        if end < 0:
+            if max_bytes is not None and len(data) == max_bytes:
+                raise ValueError(f"{self.path}: line longer than {max_bytes} bytes")
+            return b""
+        self.offset += end + 1
+        return data[:end + 1]
+
+
+class CsvTailReader(TailReader):
+    """
+    Tails a CSV with a header row and returns new rows as {column: array}.
+
+    `dtypes` optionally fixes column dtypes (e.g. {"Time": "f8"}); otherwise
+    pandas infers them per chunk.
+    """
+
+    def __init__(self, path, dtypes=None, sep=","):
+        super().__init__(path)
+        self.dtypes = dtypes
+        self.sep = sep
+        self.names = None
+
+    def _reset(self):
+        super()._reset()
+        self.names = None
+
+    def read(self, max_bytes=READ_CHUNK):
+        """New complete rows since the last read; empty arrays when nothing new."""
+        data = self.read_lines(max_bytes)
+        if self.names is None and data:
+            header, _, data = data.partition(b"\n")
+            self.names = list(pd.read_csv(io.BytesIO(header + b"\n"), sep=self.sep, nrows=0).columns)
+        if self.names is None:
+            return {}
+        if not data.strip():
+            return {name: np.empty(0) for name in self.names}
+
+        df = pd.read_csv(
+            io.BytesIO(data), sep=self.sep, header=None, names=self.names,
+            dtype=self.dtypes, engine="c",
+        )
+        return {name: df[name].to_numpy() for name in self.names}
@@ -0,0 +1,42 @@
+"""Round trips through the columnar CSV cache."""
+import os
+
+import numpy as np
+import pandas as pd
+import data_cache
+
+CSV = "Time,Label,SmoothedRTT,Loss\n0,cubic,12.5,0\n1,,13.25,1\n2,prägue,,2\n"
+
+
+def _csv(tmp_path, text=CSV):
+    path = tmp_path / "run.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_cached_frame_matches_read_csv(tmp_path):
+    path = _csv(tmp_path)
+    cache = str(tmp_path / "cache")
+    for _ in range(2):  # cold build, then read back from the .npy files
+        df = data_cache.load_csv(path, cache_dir=cache)
+        pd.testing.assert_frame_equal(df.copy(), pd.read_csv(path))
+    assert pd.isna(df["Label"][1])
+
+
+def test_column_selection(tmp_path):
+    path = _csv(tmp_path)
+    df = data_cache.load_csv(path, columns=["Loss"], cache_dir=str(tmp_path / "cache"))
+    assert list(df.columns) == ["Loss"]
+    assert df["Loss"].tolist() == [0, 1, 2]
+
+
+def test_changed_source_is_reparsed(tmp_path):
+    path = _csv(tmp_path)
+    cache = str(tmp_path / "cache")
+    first = data_cache.load_csv(path, cache_dir=cache)
+    _csv(tmp_path, CSV + "3,cubic,14.0,3\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    second = data_cache.load_csv(path, cache_dir=cache)
+    assert len(second) == len(first) + 1
+    assert second.attrs["content_hash"] != first.attrs["content_hash"]
+    assert np.array_equal(second["Time"], [0, 1, 2, 3])
@@ -0,0 +1,36 @@
+"""Typed-array encoding of figure arrays."""
+import numpy as np
+import encoding
+
+
+def test_integers_use_the_narrowest_type():
+    spec = encoding.encode_array(np.array([0, 70000]))
+    assert spec["dtype"] == "i4"
+    assert encoding.decode_array(spec).tolist() == [0, 70000]
+    assert encoding.encode_array(np.array([0, 200]))["dtype"] == "u1"
+
+
+def test_floats_round_trip_through_float32():
+    y = np.linspace(0.0, 100.0, 1001)
+    spec = encoding.encode_array(y)
+    assert spec["dtype"] == "f4"
+    np.testing.assert_allclose(encoding.decode_array(spec), y, rtol=encoding.FLOAT32_RTOL)
+
+
+def test_epoch_timestamps_stay_distinct():
+    x = 1.7e9 + 0.1 * np.arange(100)
+    spec = encoding.encode_array(x)
+    assert spec["dtype"] == "f8"
+    assert np.array_equal(encoding.decode_array(spec), x)
+
+
+def test_nan_survives():
+    spec = encoding.encode_array(np.array([1.5, np.nan, 2.5]))
+    assert np.isnan(encoding.decode_array(spec)[1])
+
+
+def test_unencodable_arrays_are_left_alone():
+    big = np.array([2**60 + 1, 3])
+    assert encoding.encode_array(big) is big
+    labels = np.array(["a", "b"])
+    assert encoding.encode_array(labels) is labels
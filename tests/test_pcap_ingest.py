@@ -0,0 +1,61 @@
+"""Synthetic-capture checks for pcap_ingest."""
+import struct
+
+import numpy as np
+import pcap_ingest
+
+A, B = "10.0.0.1", "10.0.0.2"
+
+
+def _frame(src, dst, sport, dport, seq=0, ack=0, payload=0):
+    tcp = struct.pack("!HHIIBBHHH", sport, dport, seq, ack, 5 << 4, 0x10, 65535, 0, 0)
+    ip = struct.pack("!BBHHHBBH4s4s", 0x45, 0, 40 + payload, 0, 0, 64, 6, 0,
+                     bytes(map(int, src.split("."))), bytes(map(int, dst.split("."))))
+    return b"\0" * 12 + b"\x08\x00" + ip + tcp + b"\0" * payload
+
+
+def _write_pcap(path, packets, truncate=0):
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        for t, frame in packets:
+            sec, usec = int(t), int(round((t - int(t)) * 1e6))
+            f.write(struct.pack("<IIII", sec, usec, len(frame), len(frame)) + frame)
+    if truncate:
+        with open(path, "r+b") as f:
+            f.truncate(f.seek(0, 2) - truncate)
+
+
+def _lossy_flow():
+    # Three 1000-byte segments 10 ms apart, each acked 50 ms later, except
+    # the last: it is lost, resent after 1 s and acked 40 ms after that.
+    packets, t = [], 100.0
+    for i in range(3):
+        t += 0.01
+        packets.append((t, _frame(A, B, 40000, 5201, seq=i * 1000, payload=1000)))
+        if i == 2:
+            packets.append((t + 1.0, _frame(A, B, 40000, 5201, seq=2000, payload=1000)))
+            packets.append((t + 1.04, _frame(B, A, 5201, 40000, ack=3000)))
+        else:
+            packets.append((t + 0.05, _frame(B, A, 5201, 40000, ack=(i + 1) * 1000)))
+    return sorted(packets, key=lambda p: p[0])
+
+
+def test_karn_drops_samples_of_resent_segments(tmp_path):
+    path = tmp_path / "lossy.pcap"
+    _write_pcap(path, _lossy_flow())
+    pkts = pcap_ingest.read_packets(str(path))
+    times, flows, labels = pcap_ingest.flow_metrics(pkts)
+    data = labels.index(f"tcp {A}:40000>{B}:5201")
+    assert flows["Loss"][:, data].sum() == 1
+    # Only the two cleanly acked segments give samples; the original send of
+    # the lost one would otherwise read 1040 ms.
+    assert flows["_rtt_count"][:, data].sum() == 2
+    assert np.isclose(np.nanmax(flows["SmoothedRTT"][:, data]), 50.0, atol=0.01)
+
+
+def test_truncated_last_record_is_dropped(tmp_path):
+    packets = _lossy_flow()
+    path = tmp_path / "cut.pcap"
+    _write_pcap(path, packets, truncate=10)
+    pkts = pcap_ingest.read_packets(str(path))
+    assert len(pkts) == len(packets) - 1
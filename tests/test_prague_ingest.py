@@ -0,0 +1,46 @@
+"""UDP-Prague report parsing, whole-file and tailed."""
+import numpy as np
+import prague_ingest
+from series_store import SeriesRun
+
+
+def _report(t, rtt):
+    return (f"[RECVER]: {t:.6f} sec, Rcvd: 8.062 Mbps, Sent: 0.127 Mbps, RTT: {rtt:.3f} ms, "
+            f"Mark: 0.69% (5/721), Lost: 0.14% (1/721)\n")
+
+
+def test_log_round_trips_through_a_run(tmp_path):
+    log = tmp_path / "client.log"
+    log.write_text("starting client\n" + "".join(_report(t, 7 + t) for t in range(1, 6)))
+    out = str(tmp_path / "client.series")
+    header = prague_ingest.ingest_prague(str(log), out)
+    assert header["length"] == 5
+    run = SeriesRun(out)
+    assert np.array_equal(run.column("Time"), [1, 2, 3, 4, 5])
+    assert np.array_equal(run.column("SmoothedRTT"), [8, 9, 10, 11, 12])
+    assert np.all(run.column("Throughput (Mbit/s)") == 8.062)
+    assert np.all(run.column("Loss") == 1)
+    assert np.all(run.column("Mark_Total") == 721)
+
+
+def test_small_chunks_give_the_same_columns(tmp_path):
+    log = tmp_path / "client.log"
+    log.write_text("".join(_report(t, t) for t in range(20)).rstrip("\n"))
+    whole = prague_ingest.parse_log(str(log))
+    chunked = prague_ingest.parse_log(str(log), chunk_size=37)
+    assert len(whole["Time"]) == 20
+    for name in whole:
+        assert np.array_equal(whole[name], chunked[name])
+
+
+def test_tail_reader_waits_for_complete_lines(tmp_path):
+    log = tmp_path / "client.log"
+    log.write_text(_report(1, 7.0) + _report(2, 7.5)[:30])
+    reader = prague_ingest.PragueTailReader(str(log))
+    assert reader.read()["Time"].tolist() == [1.0]
+    with open(log, "a") as f:
+        f.write(_report(2, 7.5)[30:] + _report(3, 8.0))
+    rows = reader.read()
+    assert rows["Time"].tolist() == [2.0, 3.0]
+    assert rows["SmoothedRTT"].tolist() == [7.5, 8.0]
+    assert len(reader.read()["Time"]) == 0
@@ -0,0 +1,55 @@
+"""Range queries over series pyramids."""
+import numpy as np
+import pyramid
+from downsample import minmax
+
+
+def _series(n=100_000):
+    x = np.arange(n, dtype=np.float64)
+    y = np.sin(x / 500.0)
+    y[n // 8 + 1] = 50.0  # one spike that must survive any zoom level
+    return x, y
+
+
+def test_small_ranges_come_back_raw():
+    x, y = _series()
+    xs, ys = pyramid.SeriesPyramid.build(x, y).query((1000, 1500), max_points=2000)
+    assert np.array_equal(xs, x[1000:1502])
+    assert np.array_equal(ys, y[1000:1502])
+
+
+def test_minmax_query_keeps_spike_and_ends():
+    x, y = _series()
+    xs, ys = pyramid.SeriesPyramid.build(x, y).query(None, max_points=1000)
+    assert len(xs) <= 1000
+    assert np.all(np.diff(xs) >= 0)
+    assert (xs[0], xs[-1]) == (x[0], x[-1])
+    assert ys.max() == 50.0 and xs[ys.argmax()] == len(x) // 8 + 1
+
+
+def test_levels_agree_with_raw_extremes():
+    x, y = _series()
+    y[::7] = np.nan
+    for level in pyramid.build_levels(x, y):
+        assert np.nanmax(level["max"]) == np.nanmax(y)
+        assert np.nanmin(level["min"]) == np.nanmin(y)
+        assert level["count"].sum() == np.count_nonzero(~np.isnan(y))
+
+
+def test_chunked_build_matches_one_pass():
+    x, y = _series(10_001)
+    whole = pyramid._first_level(x, y, chunk=len(x) + 3)
+    chunked = pyramid._first_level(x, y, chunk=pyramid.FACTOR * 5)
+    for field in ("x", "min", "max", "sum", "count", "x_min", "x_max"):
+        assert np.array_equal(whole[field], chunked[field])
+
+
+def test_saved_levels_round_trip(tmp_path):
+    x, y = _series(5000)
+    levels = pyramid.build_levels(x, y)
+    directory = str(tmp_path / "pyramid" / "y")
+    pyramid.save_levels(directory, levels, {"size": 1})
+    loaded = pyramid.load_levels(directory, {"size": 1})
+    assert len(loaded) == len(levels)
+    assert np.array_equal(loaded[0]["max"], levels[0]["max"], equal_nan=True)
+    assert pyramid.load_levels(directory, {"size": 2}) is None
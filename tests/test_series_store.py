@@ -0,0 +1,22 @@
+"""Memory-mapped series runs."""
+import numpy as np
+import series_store
+
+
+def test_write_append_round_trip(tmp_path):
+    path = str(tmp_path / "run.series")
+    series_store.write_run(path, {"Time": np.arange(3.0), "X per flow": np.ones((3, 2))})
+    series_store.append_run(path, {"Time": np.array([3.0, 4.0]), "X per flow": np.full((2, 2), 7.0)})
+    run = series_store.SeriesRun(path)
+    assert np.array_equal(run.column("Time"), np.arange(5.0))
+    assert run.column("X per flow")[:, 1].tolist() == [1, 1, 1, 7, 7]
+
+
+def test_append_drops_rows_of_an_interrupted_append(tmp_path):
+    path = str(tmp_path / "run.series")
+    header = series_store.write_run(path, {"Time": np.arange(3.0)})
+    # Data written, header never swapped in.
+    with open(tmp_path / "run.series" / header["columns"]["Time"]["file"], "ab") as f:
+        np.array([99.0, 99.0]).tofile(f)
+    series_store.append_run(path, {"Time": np.array([3.0])})
+    assert series_store.SeriesRun(path).column("Time").tolist() == [0, 1, 2, 3]
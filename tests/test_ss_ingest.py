@@ -0,0 +1,78 @@
+"""ss -tin log parsing."""
+import numpy as np
+import pytest
+import ss_ingest
+
+T0 = 1749182714.0
+
+
+def _snapshot(i):
+    return (
+        f"{T0 + i * 0.5:.6f}\n"
+        "State  Recv-Q Send-Q Local Address:Port  Peer Address:Port\n"
+        "ESTAB  0      0      10.0.0.1:40000      10.0.0.2:5201\n"
+        f"\t cubic wscale:7,7 rto:204 rtt:{10 + i}.5/3.2 mss:1448 cwnd:{100 + i} "
+        f"pacing_rate {200 + i}Mbps delivery_rate 900Kbps minrtt:9.1 retrans:0/{i}\n"
+        "ESTAB  0      0      10.0.0.1:22         10.0.0.9:51000\n"
+        "\t cubic rtt:0.3/0.1 mss:1448 cwnd:10\n"
+    )
+
+
+def _log(tmp_path, n=6, tail=""):
+    path = tmp_path / "ss.log"
+    path.write_text("".join(_snapshot(i) for i in range(n)) + tail)
+    return str(path)
+
+
+def test_fields_of_the_busiest_socket(tmp_path):
+    columns, flows = ss_ingest.parse_ss(_log(tmp_path))
+    assert flows == ["10.0.0.1:40000 10.0.0.2:5201", "10.0.0.1:22 10.0.0.9:51000"]
+    rows, label = ss_ingest.select_flow(columns, flows, "5201")
+    assert label == flows[0]
+    assert np.allclose(rows["Time"], np.arange(6) * 0.5)
+    assert np.allclose(rows["SmoothedRTT"], np.arange(6) + 10.5)
+    assert np.allclose(rows["cwnd"], np.arange(6) + 100)
+    assert np.allclose(rows["snd_cwnd_kb"], rows["cwnd"] * 1448 / 1024)
+    assert np.allclose(rows["pacing_rate"], np.arange(6) + 200)
+    assert np.allclose(rows["delivery_rate"], 0.9)
+    assert np.array_equal(rows["retrans"], np.arange(6))
+
+
+def test_missing_fields_are_nan(tmp_path):
+    columns, flows = ss_ingest.parse_ss(_log(tmp_path))
+    rows, _ = ss_ingest.select_flow(columns, flows, "10.0.0.9")
+    assert np.allclose(rows["SmoothedRTT"], 0.3)
+    assert np.isnan(rows["pacing_rate"]).all()
+
+
+def test_small_chunks_give_the_same_columns(tmp_path):
+    path = _log(tmp_path)
+    whole, flows = ss_ingest.parse_ss(path)
+    chunked, chunked_flows = ss_ingest.parse_ss(path, chunk_size=41)
+    assert chunked_flows == flows
+    for name in whole:
+        assert np.array_equal(whole[name], chunked[name], equal_nan=True)
+
+
+def test_run_round_trip(tmp_path):
+    out = str(tmp_path / "ss.series")
+    header = ss_ingest.ingest_ss(_log(tmp_path), out, flow="5201")
+    assert header["length"] == 6
+    assert header["attrs"]["flow"] == "10.0.0.1:40000 10.0.0.2:5201"
+
+
+def test_unknown_flow_lists_the_flows(tmp_path):
+    columns, flows = ss_ingest.parse_ss(_log(tmp_path))
+    with pytest.raises(ValueError, match="10.0.0.2:5201"):
+        ss_ingest.select_flow(columns, flows, "10.9.9.9")
+
+
+def test_tail_reader_holds_back_a_socket_line_without_its_info(tmp_path):
+    path = _log(tmp_path, n=2, tail=f"{T0 + 1:.6f}\nESTAB  0      0      10.0.0.1:40000      10.0.0.2:5201\n")
+    reader = ss_ingest.SsTailReader(path, flow="5201")
+    assert len(reader.read()["Time"]) == 2
+    with open(path, "a") as f:
+        f.write("\t cubic rtt:20.0/1.0 mss:1448 cwnd:5\n")
+    rows = reader.read()
+    assert rows["Time"].tolist() == [1.0]
+    assert rows["SmoothedRTT"].tolist() == [20.0]
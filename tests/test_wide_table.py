@@ -0,0 +1,34 @@
+"""Wide tables standing in for per-metric CSVs."""
+import registry
+import wide_table
+
+
+def _write(tmp_path):
+    (tmp_path / "cubic_rtt.csv").write_text(
+        "Time,Throughput (Mbit/s),SmoothedRTT\n0,10,5.5\n1,11,6.5\n2,12,7.5\n")
+    (tmp_path / "cubic_thrpt.csv").write_text("Time,Throughput (Mbit/s)\n0,10\n1,11\n2,12\n")
+    (tmp_path / "cubic_lost_packets.csv").write_text("Lost_Packets\n0\n3\n")
+
+
+def test_views_serve_only_their_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr("data_cache.CACHE_DIR", str(tmp_path / "cache"))
+    _write(tmp_path)
+    header = wide_table.build_wide(str(tmp_path), "cubic")
+    assert header["attrs"]["views"]["cubic_lost_packets"] == ["Time", "Lost_Packets"]
+
+    run = registry.Run("test", str(tmp_path))
+    frames = run.frames({"lost": "cubic_lost_packets", "thrpt": "cubic_thrpt"})
+    assert list(frames["lost"].columns) == ["Time", "Lost_Packets"]
+    assert frames["lost"]["Lost_Packets"].tolist()[:2] == [0, 3]
+    assert list(frames["thrpt"].columns) == ["Time", "Throughput (Mbit/s)"]
+
+
+def test_stale_wide_table_is_not_used(tmp_path, monkeypatch):
+    monkeypatch.setattr("data_cache.CACHE_DIR", str(tmp_path / "cache"))
+    _write(tmp_path)
+    wide_table.build_wide(str(tmp_path), "cubic")
+    with open(tmp_path / "cubic_thrpt.csv", "a") as f:
+        f.write("3,13\n")
+    assert wide_table.wide_views(str(tmp_path / "cubic.series")) == {}
+    run = registry.Run("test", str(tmp_path))
+    assert run.series["cubic_thrpt"].path.endswith(".csv")
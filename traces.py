@@ -0,0 +1,82 @@
+"""
+Trace builders for the telemetry line charts.
+
+Builds one go.Scatter per variant straight from each frame's x/y column
+arrays, instead of copying every frame into one long-format frame for
+px.line to split up again by legend.
+
+Figures switch from SVG Scatter to WebGL Scattergl traces once any variant
+has more than WEBGL_THRESHOLD points ($DASH_WEBGL_THRESHOLD, default 20000).
+"""
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+
+WEBGL_THRESHOLD = int(os.environ.get("DASH_WEBGL_THRESHOLD", 20000))
+
+
+def _column(df, name, fallback):
+    if name in df.columns:
+        return df[name].to_numpy()
+    return np.full(len(df), fallback)
+
+
+def trace_class(point_counts, webgl_threshold=None):
+    """go.Scattergl if any count exceeds the threshold, else go.Scatter."""
+    threshold = WEBGL_THRESHOLD if webgl_threshold is None else webgl_threshold
+    if any(n > threshold for n in point_counts):
+        return go.Scattergl
+    return go.Scatter
+
+
+def build_traces(data_dict, y_label, x_label="Time", legend_title="Legend",
+                 label_fallback=0, mode="lines", webgl_threshold=None):
+    """
+    One trace per (legend name, DataFrame) item, styled like px.line.
+
+    All traces share one type so SVG and WebGL layers never interleave.
+    """
+    series = []
+    for name, df in data_dict.items():
+        x = _column(df, x_label, label_fallback)
+        y = _column(df, y_label, label_fallback)
+        series.append((name, x, y))
+
+    scatter = trace_class([len(x) for _, x, _ in series], webgl_threshold)
+    traces = []
+    for name, x, y in series:
+        traces.append(scatter(
+            x=x,
+            y=y,
+            name=name,
+            legendgroup=name,
+            showlegend=True,
+            mode=mode,
+            hovertemplate=(
+                f"{legend_title}={name}<br>{x_label}=%{{x}}<br>{y_label}=%{{y}}<extra></extra>"
+            ),
+        ))
+    return traces
+
+
+def line_figure(data_dict, y_label, x_label="Time", legend_title="Legend",
+                label_fallback=0, mode="lines", webgl_threshold=None, **layout):
+    """
+    Equivalent of px.line(prepare_graph_data(...), color=legend_title).
+
+    Extra keyword arguments are passed to fig.update_layout.
+    """
+    fig = go.Figure(data=build_traces(
+        data_dict, y_label, x_label=x_label, legend_title=legend_title,
+        label_fallback=label_fallback, mode=mode, webgl_threshold=webgl_threshold,
+    ))
+    fig.update_layout(
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        legend_title_text=legend_title,
+        legend_tracegroupgap=0,
+        margin_t=60,
+    )
+    fig.update_layout(**layout)
+    return fig
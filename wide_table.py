@@ -0,0 +1,146 @@
+"""
+One wide, time-indexed table per variant instead of per-metric CSV copies.
+
+graph_data/ holds each variant several times: <variant>_thrpt.csv and
+<variant>_loss.csv are column projections of <variant>_rtt.csv, and
+<variant>_lost_packets.csv has no Time column at all (row i is second i,
+like the primary table's index). build_wide() folds them into a single
+<variant>.series run:
+
+    - the primary table (<variant>_rtt.csv) gives Time and its columns;
+    - a projection adds only the columns the primary lacks, joined on Time
+      with searchsorted (its duplicate columns are checked, then dropped);
+    - a table without Time is joined by position: its row t lands on the
+      primary row whose Time is t (rows past the last Time are dropped).
+
+The run's attrs map each per-metric name it replaces to that table's columns
+("views") and record the size and mtime of every source, so the registry can
+serve e.g. "cubic_thrpt" as a zero-copy selection of its columns of
+cubic.series while the sources are unchanged.
+
+    python wide_table.py graph_data [variant ...]
+"""
+import os
+import sys
+
+import numpy as np
+from data_cache import file_stamp, load_csv
+from series_store import SUFFIX, SeriesRun, is_run, write_run
+
+PRIMARY_METRIC = "rtt"
+
+
+def variant_sources(directory, variant):
+    """{series name: path} of the variant's CSVs, primary first."""
+    prefix = f"{variant}_"
+    names = sorted(
+        f[:-4] for f in os.listdir(directory)
+        if f.startswith(prefix) and f.endswith(".csv")
+    )
+    primary = f"{prefix}{PRIMARY_METRIC}"
+    if primary not in names:
+        raise FileNotFoundError(f"{directory}: no {primary}.csv")
+    names.remove(primary)
+    return {name: os.path.join(directory, f"{name}.csv") for name in [primary] + names}
+
+
+def variants(directory):
+    """Variants in `directory` that have a primary table."""
+    suffix = f"_{PRIMARY_METRIC}.csv"
+    return sorted(f[:-len(suffix)] for f in os.listdir(directory) if f.endswith(suffix))
+
+
+def _numeric(df):
+    # "Unnamed: 0" is a saved pandas index; in these files it repeats Time.
+    return {
+        c: df[c].to_numpy() for c in df.columns
+        if df[c].dtype.kind in "biuf" and not c.startswith("Unnamed:")
+    }
+
+
+def join_on_time(time, other_time, values):
+    """`values` (indexed by other_time) placed on the rows of `time`; NaN where absent."""
+    order = np.argsort(other_time, kind="stable")
+    sorted_time = np.asarray(other_time)[order]
+    pos = np.minimum(np.searchsorted(sorted_time, time), len(sorted_time) - 1)
+    hit = sorted_time[pos] == time if len(sorted_time) else np.zeros(len(time), dtype=bool)
+    out = np.full(len(time), np.nan)
+    out[hit] = np.asarray(values)[order][pos[hit]]
+    return out
+
+
+def join_by_position(time, values):
+    """Row t of a Time-less table placed on the primary row whose Time is t."""
+    idx = np.asarray(time)
+    hit = (idx >= 0) & (idx < len(values)) & (idx == np.floor(idx))
+    out = np.full(len(idx), np.nan)
+    out[hit] = np.asarray(values)[idx[hit].astype(np.int64)]
+    return out
+
+
+def build_wide(directory, variant, out_path=None):
+    """Write the variant's wide run; returns its header."""
+    sources = variant_sources(directory, variant)
+    names = list(sources)
+    primary = load_csv(sources[names[0]])
+    columns = _numeric(primary)
+    time = columns["Time"]
+    views = {names[0]: list(columns)}
+
+    for name in names[1:]:
+        table = _numeric(load_csv(sources[name]))
+        views[name] = ["Time"] + [col for col in table if col != "Time"]
+        if "Time" in table:
+            for col, values in table.items():
+                if col == "Time":
+                    continue
+                joined = join_on_time(time, table["Time"], values)
+                if col in columns:
+                    if not np.allclose(columns[col], joined, equal_nan=True):
+                        raise ValueError(f"{name}.csv: {col!r} disagrees with {names[0]}.csv")
+                    continue
+                columns[col] = joined
+        else:
+            for col, values in table.items():
+                columns.setdefault(col, join_by_position(time, values))
+
+    out_path = out_path or os.path.join(directory, variant + SUFFIX)
+    return write_run(out_path, columns, index="Time", attrs={
+        "variant": variant,
+        "views": views,
+        "sources": {name: {"file": os.path.basename(path), **file_stamp(path)}
+                    for name, path in sources.items()},
+    })
+
+
+def is_current(run):
+    """True when every CSV a wide run was built from is unchanged (a SeriesRun)."""
+    directory = os.path.dirname(os.path.normpath(run.path))
+    for source in run.attrs.get("sources", {}).values():
+        try:
+            if file_stamp(os.path.join(directory, source["file"])) != {
+                "size": source["size"], "mtime_ns": source["mtime_ns"]
+            }:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def wide_views(path):
+    """{series name: its columns} a wide run at `path` can stand in for ({} if none or stale)."""
+    if not is_run(path):
+        return {}
+    run = SeriesRun(path)
+    # Runs written before views carried their columns list names only; skip them.
+    if not isinstance(run.attrs.get("views"), dict) or not is_current(run):
+        return {}
+    return {name: list(columns) for name, columns in run.attrs["views"].items()}
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1]
+    for name in sys.argv[2:] or variants(directory):
+        header = build_wide(directory, name)
+        print(f"{name}: {header['length']} rows, {len(header['columns'])} columns "
+              f"from {', '.join(header['attrs']['views'])}")